@@ -1,5 +1,7 @@
 from django.contrib import admin
+from django.db import transaction
 from .models import *
+from .utils import adjust_follow_counts
 
 
 @admin.register(User)
@@ -16,12 +18,53 @@ class UserAdmin(admin.ModelAdmin):
     ]
     list_filter = ["is_active", "is_superuser", "is_staff", "is_admin"]
     search_fields = ("email",)
+    readonly_fields = ["followers_count", "following_count"]
     list_per_page = 20
 
+    def save_model(self, request, obj, form, change):
+        if not change:
+            return super().save_model(request, obj, form, change)
+        fields = {field.name for field in User._meta.concrete_fields}
+        obj.save(update_fields=[name for name in form.changed_data if name in fields])
+
 
 @admin.register(Follow)
 class FollowAdmin(admin.ModelAdmin):
     list_display = ['follower', 'following', 'status']
     list_per_page = 20
 
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            if change:
+                self.uncount(Follow.objects.select_for_update().filter(pk=obj.pk))
+            obj.save()
+            if obj.status == Follow.Status.ACCEPTED:
+                adjust_follow_counts(obj.follower_id, obj.following_id, 1)
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, Follow.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            self.uncount(queryset.select_for_update())
+            queryset.delete()
+
+    def uncount(self, follows):
+        accepted = follows.filter(status=Follow.Status.ACCEPTED)
+        for follower_id, following_id in accepted.values_list(
+            "follower_id", "following_id"
+        ):
+            adjust_follow_counts(follower_id, following_id, -1)
+
+@admin.register(ProfileVisitDay)
+class ProfileVisitDayAdmin(admin.ModelAdmin):
+    list_display = ['profile', 'day', 'visitors']
+    exclude = ['sketch']
+    list_per_page = 20
+
+@admin.register(FollowSuggestion)
+class FollowSuggestionAdmin(admin.ModelAdmin):
+    list_display = ['user', 'suggested', 'score', 'mutual_count', 'created_at']
+    list_per_page = 20
+
 admin.site.register(Contact)
\ No newline at end of file
@@ -0,0 +1,142 @@
+import bisect
+import threading
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+User = get_user_model()
+
+VERSION_KEY = "autocomplete:version"
+
+
+def change_key(version):
+    return f"autocomplete:change:{version}"
+
+
+def index_keys(username, slug):
+    return {username.lower(), (slug or "").lower()} - {""}
+
+
+def shared_version():
+    return cache.get(VERSION_KEY, 0)
+
+
+class PrefixIndex:
+    def __init__(self):
+        self.keys = []
+        self.users = {}
+        self.version = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        version = shared_version()
+        users = User.objects.values_list(
+            "id", "username", "slug", "is_admin", "verified"
+        )
+
+        self.users = {user_id: tuple(entry) for user_id, *entry in users}
+        self.keys = sorted(
+            (key, user_id)
+            for user_id, (username, slug, *_) in self.users.items()
+            for key in index_keys(username, slug)
+        )
+        self.version = version
+
+    def add(self, user_id, username, slug, is_admin, verified):
+        self.discard(user_id)
+        self.users[user_id] = (username, slug, is_admin, verified)
+        for key in index_keys(username, slug):
+            bisect.insort(self.keys, (key, user_id))
+
+    def discard(self, user_id):
+        entry = self.users.pop(user_id, None)
+        if entry is None:
+            return
+        username, slug = entry[0], entry[1]
+        for key in index_keys(username, slug):
+            position = bisect.bisect_left(self.keys, (key, user_id))
+            if position < len(self.keys) and self.keys[position] == (key, user_id):
+                del self.keys[position]
+
+    def apply(self, change):
+        if change[0] == "save":
+            self.add(*change[1:])
+        else:
+            self.discard(change[1])
+
+    def sync(self):
+        version = shared_version()
+        if self.version is None or version < self.version:
+            self.load()
+            return
+        if version == self.version:
+            return
+
+        pending = range(self.version + 1, version + 1)
+        changes = cache.get_many([change_key(number) for number in pending])
+        if len(changes) != len(pending):
+            self.load()
+            return
+        for number in pending:
+            self.apply(changes[change_key(number)])
+        self.version = version
+
+    def complete(self, prefix, limit, exclude=None, include_admins=False):
+        prefix = prefix.lower()
+        with self.lock:
+            self.sync()
+            position = bisect.bisect_left(self.keys, (prefix,))
+
+            results = []
+            seen = {exclude}
+            while position < len(self.keys) and len(results) < limit:
+                key, user_id = self.keys[position]
+                position += 1
+                if not key.startswith(prefix):
+                    break
+                if user_id in seen:
+                    continue
+                seen.add(user_id)
+
+                username, slug, is_admin, verified = self.users[user_id]
+                if not slug or (is_admin and not include_admins):
+                    continue
+                results.append(
+                    {"username": username, "slug": slug, "verified": verified}
+                )
+        return results
+
+
+index = PrefixIndex()
+
+
+def publish_change(change):
+    cache.add(VERSION_KEY, 0, None)
+    version = cache.incr(VERSION_KEY)
+    cache.set(change_key(version), change, settings.AUTOCOMPLETE_CHANGE_TIMEOUT)
+
+    with index.lock:
+        if index.version == version - 1:
+            index.apply(change)
+            index.version = version
+
+
+def user_saved(user):
+    publish_change(
+        ("save", user.id, user.username, user.slug, user.is_admin, user.verified)
+    )
+
+
+def user_deleted(user_id):
+    publish_change(("delete", user_id))
+
+
+def autocomplete(prefix, viewer):
+    if not prefix:
+        return []
+    return index.complete(
+        prefix,
+        settings.AUTOCOMPLETE_LIMIT,
+        exclude=viewer.id,
+        include_admins=viewer.is_superuser,
+    )
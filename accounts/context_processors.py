@@ -1,27 +1,46 @@
-from accounts.utils import generate_follow_suggestions
+from django.conf import settings
+from accounts.utils import mutual_follow_count, suggested_users
 from accounts.models import Follow
+from core.context_cache import ContextSection
 from notifications.models import Notification
 
 
+def follow_context(user):
+    friends = Follow.objects.filter(following=user, status=Follow.Status.PENDING)
+    return {
+        "users": list(suggested_users(user)[: settings.FOLLOW_SIDEBAR_SUGGESTIONS]),
+        "friends": list(
+            friends.select_related("follower").annotate(
+                mutual_count=mutual_follow_count(user, "follower")
+            )[:3]
+        ),
+        "friends_count": friends.count(),
+    }
+
+
+def alert_context(user):
+    alerts = Notification.objects.filter(recipient=user, read=False)
+    return {
+        "alerts": list(
+            alerts.select_related("actor", "content_type").prefetch_related(
+                "content_object"
+            )[:5]
+        ),
+        "alerts_count": alerts.count(),
+    }
+
+
 def follow_suggestions(request):
     if "superuser" in request.path:
         return {}
     else:
         if request.user.is_authenticated:
-            friends = Follow.objects.filter(
-                following=request.user, status=Follow.Status.PENDING
-            )
-            users = generate_follow_suggestions(request.user)
-            alerts = (
-                Notification.objects.filter(recipient=request.user, read=False)
-                .select_related("actor", "content_type")
-                .prefetch_related("content_object")
-            )
+            follows = ContextSection("follows", request.user, follow_context)
+            alerts = ContextSection("alerts", request.user, alert_context)
 
             return {
-                "users": users,
-                "alerts": alerts,
-                "friends": friends,
+                **follows.lazy("users", "friends", "friends_count"),
+                **alerts.lazy("alerts", "alerts_count"),
             }
         else:
             return {}
@@ -0,0 +1,173 @@
+import numpy as np
+
+
+def spans(starts, counts):
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return offsets + np.arange(counts.sum(), dtype=np.int64)
+
+
+def csr(sources, targets, size):
+    order = np.lexsort((targets, sources))
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=size), out=indptr[1:])
+    return indptr, targets[order].astype(np.int32)
+
+
+def neighbours(indptr, indices, owners, nodes):
+    starts = indptr[nodes]
+    counts = indptr[nodes + 1] - starts
+    return np.repeat(owners, counts), indices[spans(starts, counts)]
+
+
+class FollowGraph:
+    def __init__(
+        self, user_ids, sources, targets, accepted, blocked=None, prior_weight=0.5
+    ):
+        self.user_ids = list(user_ids)
+        self.index = {user_id: row for row, user_id in enumerate(self.user_ids)}
+        self.size = len(self.user_ids)
+
+        if blocked is None:
+            blocked = np.empty((0, 2), dtype=np.int32)
+        blockers, blockees = blocked[:, 0], blocked[:, 1]
+
+        followers, followees = sources[accepted], targets[accepted]
+        self.indptr, self.indices = csr(followers, followees, self.size)
+        self.walk_indptr, self.walk_indices = csr(
+            np.concatenate([followers, followees]),
+            np.concatenate([followees, followers]),
+            self.size,
+        )
+        self.excluded_indptr, self.excluded_indices = csr(
+            np.concatenate([sources, blockers, blockees]),
+            np.concatenate([targets, blockees, blockers]),
+            self.size,
+        )
+
+        in_degree = np.bincount(followees, minlength=self.size)
+        scale = np.log1p(in_degree.max(initial=0)) or 1.0
+        self.prior = prior_weight * np.log1p(in_degree) / scale
+        self.popular = np.argsort(-in_degree, kind="stable").astype(np.int32)
+
+    def two_hop(self, rows):
+        rows = np.asarray(rows, dtype=np.int64)
+        owners = np.arange(len(rows), dtype=np.int64)
+        middle_owners, middle = neighbours(self.indptr, self.indices, owners, rows)
+        return neighbours(self.indptr, self.indices, middle_owners, middle)
+
+    def score(self, rows, limit):
+        rows = np.asarray(rows, dtype=np.int64)
+        candidate_owners, candidates = self.two_hop(rows)
+        return self.rank(rows, candidate_owners, candidates, limit, 1.0)
+
+    def walk(self, rows, limit, walks, restart, max_steps, seed=0):
+        rows = np.asarray(rows, dtype=np.int64)
+        rng = np.random.default_rng(seed)
+
+        owners = np.repeat(np.arange(len(rows), dtype=np.int64), walks)
+        positions = np.repeat(rows, walks)
+        visit_owners = [np.empty(0, dtype=np.int64)]
+        visits = [np.empty(0, dtype=np.int64)]
+
+        for _ in range(max_steps):
+            starts = self.walk_indptr[positions]
+            degree = self.walk_indptr[positions + 1] - starts
+            moving = degree > 0
+            owners, starts, degree = owners[moving], starts[moving], degree[moving]
+
+            steps = (rng.random(len(owners)) * degree).astype(np.int64)
+            positions = self.walk_indices[starts + steps].astype(np.int64)
+            visit_owners.append(owners)
+            visits.append(positions)
+
+            alive = rng.random(len(owners)) >= restart
+            owners, positions = owners[alive], positions[alive]
+            if not len(owners):
+                break
+
+        results = self.rank(
+            rows, np.concatenate(visit_owners), np.concatenate(visits), limit, 1 / walks
+        )
+        return self.with_mutuals(rows, results)
+
+    def with_mutuals(self, rows, results):
+        owners, candidates = self.two_hop(rows)
+        paths, mutuals = np.unique(owners * self.size + candidates, return_counts=True)
+        paths = np.append(paths, np.iinfo(np.int64).max)
+        mutuals = np.append(mutuals, 0)
+
+        pairs = np.array(
+            [
+                owner * self.size + candidate
+                for owner, suggestions in enumerate(results)
+                for candidate, *_ in suggestions
+            ],
+            dtype=np.int64,
+        )
+        found = np.searchsorted(paths, pairs)
+        counts = iter(np.where(paths[found] == pairs, mutuals[found], 0).tolist())
+        return [
+            [(candidate, score, next(counts)) for candidate, score, hits in suggestions]
+            for suggestions in results
+        ]
+
+    def rank(self, rows, owners, candidates, limit, weight):
+        positions = np.arange(len(rows), dtype=np.int64)
+        excluded_owners, excluded = neighbours(
+            self.excluded_indptr, self.excluded_indices, positions, rows
+        )
+        excluded = np.concatenate(
+            [excluded_owners * self.size + excluded, positions * self.size + rows]
+        )
+
+        keys = owners * self.size + candidates
+        keys, hits = np.unique(keys[~np.isin(keys, excluded)], return_counts=True)
+
+        owners, candidates = keys // self.size, keys % self.size
+        scores = (hits + self.prior[candidates]) * weight
+        order = np.lexsort((-scores, owners))
+        owners, candidates = owners[order], candidates[order]
+        scores, hits = scores[order], hits[order]
+
+        keep = np.arange(len(owners)) - np.searchsorted(owners, owners) < limit
+        results = [[] for _ in range(len(rows))]
+        for owner, candidate, score, count in zip(
+            owners[keep].tolist(),
+            candidates[keep].tolist(),
+            scores[keep].tolist(),
+            hits[keep].tolist(),
+        ):
+            results[owner].append((candidate, score, count))
+
+        for owner, row in enumerate(rows.tolist()):
+            if len(results[owner]) < limit:
+                self.fill(results[owner], row, limit, weight)
+        return results
+
+    def fill(self, suggestions, row, limit, weight):
+        start, end = self.excluded_indptr[row], self.excluded_indptr[row + 1]
+        skip = set(self.excluded_indices[start:end].tolist()) | {row}
+        skip |= {candidate for candidate, *_ in suggestions}
+
+        step = limit * 4
+        for offset in range(0, self.size, step):
+            for candidate in self.popular[offset : offset + step].tolist():
+                if candidate in skip:
+                    continue
+                suggestions.append(
+                    (candidate, float(self.prior[candidate] * weight), 0)
+                )
+                if len(suggestions) == limit:
+                    return
+
+
+shared_graph = None
+
+
+def share_graph(graph):
+    global shared_graph
+    shared_graph = graph
+
+
+def walk_shard(args):
+    return shared_graph.walk(*args)
@@ -0,0 +1,151 @@
+import numpy as np
+from time import perf_counter
+from collections import Counter
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count
+from accounts.suggestions import load_follow_graph, rank_shards
+from accounts.models import Follow
+
+User = get_user_model()
+
+
+def generate_follow_suggestions(user, max_results=5):
+    suggestions = []
+
+    UIfollowing = user.following.values_list("following_id", flat=True)
+
+    if UIfollowing.exists():
+        FriendsOfUsers = (
+            Follow.objects.filter(
+                follower__in=UIfollowing, status=Follow.Status.PENDING
+            )
+            .values_list("following", flat=True)
+            .exclude(following=user)
+        )
+
+        if FriendsOfUsers.exists():
+            counter = Counter(FriendsOfUsers)
+            top_suggestions = [
+                user_id for user_id, count in counter.most_common(max_results)
+            ]
+            suggestions.extend(top_suggestions)
+
+        if len(suggestions) < max_results:
+            remaining = max_results - len(suggestions)
+            popular_user = (
+                User.objects.filter(id__in=UIfollowing)
+                .annotate(follower_count=Count("followers"))
+                .order_by("-follower_count")
+                .exclude(id=user.id)[:remaining]
+            )
+            suggestions.extend(popular_user.values_list("id", flat=True))
+
+    if len(suggestions) < max_results:
+        remaining = max_results - len(suggestions)
+        popular_users = (
+            User.objects.exclude(id=user.id)
+            .annotate(high_followers=Count("followers"))
+            .order_by("-high_followers")[:remaining]
+        )
+        suggestions.extend(popular_users.values_list("id", flat=True))
+
+    return User.objects.filter(id__in=suggestions).exclude(id__in=UIfollowing)
+
+
+class Command(BaseCommand):
+    help = "Compare the per-user suggestion queries with the vectorized follow graph"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--synthetic-edges", type=int, default=0)
+        parser.add_argument("--synthetic-users", type=int, default=50000)
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options["synthetic_edges"]:
+                self.create_synthetic_graph(
+                    options["synthetic_users"],
+                    options["synthetic_edges"],
+                    options["seed"],
+                )
+            self.compare(options["users"])
+            transaction.set_rollback(True)
+
+    def create_synthetic_graph(self, size, edges, seed):
+        rng = np.random.default_rng(seed)
+        sources = rng.integers(0, size, edges * 2)
+        targets = (size * rng.random(edges * 2) ** 3).astype(np.int64)
+        valid = sources != targets
+        keys = np.unique(sources[valid] * size + targets[valid])
+        keys = rng.permutation(keys)[:edges]
+        sources, targets = keys // size, keys % size
+        accepted = rng.random(len(keys)) < 0.95
+
+        followers = np.bincount(targets[accepted], minlength=size).tolist()
+        following = np.bincount(sources[accepted], minlength=size).tolist()
+        users = User.objects.bulk_create(
+            (
+                User(
+                    username=f"__bench_{i}",
+                    email=f"__bench_{i}@example.com",
+                    slug=f"__bench_{i}",
+                    password="!",
+                    followers_count=followers[i],
+                    following_count=following[i],
+                )
+                for i in range(size)
+            ),
+            batch_size=5000,
+        )
+        Follow.objects.bulk_create(
+            (
+                Follow(
+                    follower=users[source],
+                    following=users[target],
+                    status=Follow.Status.ACCEPTED if ok else Follow.Status.PENDING,
+                )
+                for source, target, ok in zip(
+                    sources.tolist(), targets.tolist(), accepted.tolist()
+                )
+            ),
+            batch_size=5000,
+        )
+        self.stdout.write(f"Created {size} users and {len(keys)} follows")
+
+    def compare(self, sample):
+        started = perf_counter()
+        graph = load_follow_graph()
+        load_ms = (perf_counter() - started) * 1000
+
+        started = perf_counter()
+        for shard, results in rank_shards(
+            graph, np.arange(graph.size), settings.FOLLOW_SUGGESTIONS_SIZE
+        ):
+            pass
+        score_ms = (perf_counter() - started) * 1000
+        graph_ms = load_ms + score_ms
+
+        step = max(graph.size // sample, 1)
+        users = list(User.objects.filter(id__in=graph.user_ids[::step][:sample]))
+        started = perf_counter()
+        for user in users:
+            list(generate_follow_suggestions(user))
+        legacy_ms = (perf_counter() - started) * 1000 / max(len(users), 1)
+
+        self.stdout.write(
+            f"graph: load {load_ms:.0f}ms, score {score_ms:.0f}ms "
+            f"for {graph.size} users ({graph_ms / max(graph.size, 1):.3f}ms per user)"
+        )
+        self.stdout.write(
+            f"legacy: {legacy_ms:.2f}ms per user over {len(users)} users "
+            f"(~{legacy_ms * graph.size / 1000:.0f}s for all users)"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Speedup: {legacy_ms * graph.size / max(graph_ms, 1):.1f}x"
+            )
+        )
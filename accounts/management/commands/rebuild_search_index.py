@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from accounts.search import get_user_search_index
+
+
+class Command(BaseCommand):
+    help = "Create the user search index if needed and repopulate it"
+
+    def handle(self, *args, **options):
+        index = get_user_search_index()
+        index.install()
+        indexed = index.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"{type(index).__name__}: indexed {indexed} users")
+        )
@@ -0,0 +1,29 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from accounts.utils import follow_count_totals
+from core.counters import reconcile_counts
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Recompute followers_count and following_count of every User from the Follow table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report drifted counters, exit with an error if any are found",
+        )
+
+    def handle(self, *args, **options):
+        drifted = 0
+        for field, totals in follow_count_totals().items():
+            count = reconcile_counts(User, field, totals, fix=not options["check"])
+            drifted += count
+            verb = "found" if options["check"] else "fixed"
+            self.stdout.write(f"{field}: {verb} {count} drifted users")
+
+        if options["check"] and drifted:
+            raise CommandError(f"{drifted} follow counters have drifted")
+        self.stdout.write(self.style.SUCCESS("Follow counters are consistent"))
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:40
+
+from django.db import migrations
+
+SEARCH_TABLE = "accounts_user_search"
+SEARCH_FIELDS = ("username", "first_name", "last_name", "bio")
+
+
+def install_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    user_table = apps.get_model("accounts", "User")._meta.db_table
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+                "user_id UNINDEXED, username, first_name, last_name, bio, "
+                "tokenize='trigram')"
+            )
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} "
+                "(user_id, username, first_name, last_name, bio) "
+                "SELECT id, username, first_name, last_name, COALESCE(bio, '') "
+                f"FROM {user_table}"
+            )
+        elif connection.vendor == "postgresql":
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for field in SEARCH_FIELDS:
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {user_table}_{field}_trgm "
+                    f"ON {user_table} USING gin ({field} gin_trgm_ops)"
+                )
+
+
+def uninstall_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    user_table = apps.get_model("accounts", "User")._meta.db_table
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+        elif connection.vendor == "postgresql":
+            for field in SEARCH_FIELDS:
+                cursor.execute(f"DROP INDEX IF EXISTS {user_table}_{field}_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_alter_user_cover_alter_user_img'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:34
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_follow_counts(apps, schema_editor):
+    User = apps.get_model("accounts", "User")
+    Follow = apps.get_model("accounts", "Follow")
+
+    def total(**filters):
+        return Coalesce(
+            Subquery(
+                Follow.objects.filter(status="accepted", **filters)
+                .order_by()
+                .values(*filters)
+                .annotate(total=Count("id"))
+                .values("total")
+            ),
+            0,
+        )
+
+    User.objects.update(
+        followers_count=total(following=OuterRef("pk")),
+        following_count=total(follower=OuterRef("pk")),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_user_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_follow_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0009_follow_counts"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="follow",
+            index=models.Index(
+                fields=["following", "status", "-created_at", "-id"],
+                name="follow_followers_page_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="follow",
+            index=models.Index(
+                fields=["follower", "status", "-created_at", "-id"],
+                name="follow_following_page_idx",
+            ),
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX accounts_user_viewers_page_idx "
+            "ON accounts_user_viewers (from_user_id, id)",
+            "DROP INDEX accounts_user_viewers_page_idx",
+        ),
+    ]
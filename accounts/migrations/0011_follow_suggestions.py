@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_follow_page_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FollowSuggestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('suggested', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='suggested_to', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='follow_suggestions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-score'],
+                'indexes': [models.Index(fields=['user', '-score'], name='accounts_fo_user_id_eb8e77_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'suggested'), name='unique_follow_suggestion')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_follow_suggestions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='followsuggestion',
+            name='mutual_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_follow_suggestion_mutual_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileVisitDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('sketch', models.BinaryField(default=b'')),
+                ('visitors', models.PositiveIntegerField(default=0)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='visit_days', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-day'],
+                'constraints': [models.UniqueConstraint(fields=('profile', 'day'), name='unique_profile_visit_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_profile_visit_days'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:48
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+from django.utils import timezone
+
+
+def backfill_refreshed_at(apps, schema_editor):
+    User = apps.get_model("accounts", "User")
+    FollowSuggestion = apps.get_model("accounts", "FollowSuggestion")
+    latest = (
+        FollowSuggestion.objects.filter(
+            user=OuterRef("pk"), expires_at__gt=timezone.now()
+        )
+        .values("user")
+        .annotate(latest=Max("created_at"))
+        .values("latest")
+    )
+    User.objects.update(suggestions_refreshed_at=Subquery(latest))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0014_follow_counts_not_editable'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='suggestions_refreshed_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_refreshed_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:09
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0015_user_suggestions_refreshed_at'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='followsuggestion',
+            name='expires_at',
+        ),
+    ]
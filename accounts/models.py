@@ -68,7 +68,12 @@ class User(AbstractBaseUser, PermissionsMixin):
     show_followers = models.BooleanField(default=True)
     show_following = models.BooleanField(default=True)
     check_followers = models.BooleanField(default=False)
-    
+    followers_count = models.PositiveIntegerField(default=0, editable=False)
+    following_count = models.PositiveIntegerField(default=0, editable=False)
+    suggestions_refreshed_at = models.DateTimeField(
+        null=True, blank=True, db_index=True, editable=False
+    )
+
     viewers = models.ManyToManyField(
         settings.AUTH_USER_MODEL, blank=True, related_name="users"
     )
@@ -116,8 +121,17 @@ class User(AbstractBaseUser, PermissionsMixin):
         else:
             return f""
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user._loaded_verified = user.__dict__.get("verified")
+        return user
+
     def save(self, *args, **kwargs):
         self.slug = slugify(self.username)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "username" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "slug"}
         return super(User, self).save(*args, **kwargs)
 
 
@@ -144,12 +158,68 @@ class Follow(models.Model):
                 fields=["follower", "following"], name="unique_follow"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["following", "status", "-created_at", "-id"],
+                name="follow_followers_page_idx",
+            ),
+            models.Index(
+                fields=["follower", "status", "-created_at", "-id"],
+                name="follow_following_page_idx",
+            ),
+        ]
         ordering = ["-created_at"]
 
     def __str__(self):
         return f"{self.follower} → {self.following} ({self.status})"
 
 
+class FollowSuggestion(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="follow_suggestions",
+        on_delete=models.CASCADE,
+    )
+    suggested = models.ForeignKey(
+        settings.AUTH_USER_MODEL, related_name="suggested_to", on_delete=models.CASCADE
+    )
+    score = models.FloatField()
+    mutual_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "suggested"], name="unique_follow_suggestion"
+            )
+        ]
+        indexes = [models.Index(fields=["user", "-score"])]
+        ordering = ["-score"]
+
+    def __str__(self):
+        return f"{self.user} → {self.suggested} ({self.score:.2f})"
+
+
+class ProfileVisitDay(models.Model):
+    profile = models.ForeignKey(
+        settings.AUTH_USER_MODEL, related_name="visit_days", on_delete=models.CASCADE
+    )
+    day = models.DateField()
+    sketch = models.BinaryField(default=b"")
+    visitors = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["profile", "day"], name="unique_profile_visit_day"
+            )
+        ]
+        ordering = ["-day"]
+
+    def __str__(self):
+        return f"{self.profile} {self.day}: {self.visitors}"
+
+
 class Contact(models.Model):
     email = models.EmailField(max_length=250)
     message = models.TextField()
@@ -0,0 +1,183 @@
+import uuid
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Log
+
+User = get_user_model()
+
+SEARCH_TABLE = "accounts_user_search"
+SEARCH_FIELDS = ("username", "first_name", "last_name", "bio")
+
+
+def escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class UserSearchIndex:
+    def install(self):
+        pass
+
+    def uninstall(self):
+        pass
+
+    def rebuild(self):
+        return User.objects.count()
+
+    def update(self, user):
+        pass
+
+    def remove(self, user_id):
+        pass
+
+    def candidates(self, query, limit, exclude=None, include_admins=False):
+        users = User.objects.filter(
+            Q(username__icontains=query)
+            | Q(first_name__icontains=query)
+            | Q(last_name__icontains=query)
+            | Q(bio__icontains=query)
+        ).exclude(id=exclude)
+        if not include_admins:
+            users = users.exclude(is_admin=True)
+
+        prefix = Case(
+            When(username__istartswith=query, then=Value(1.0)), default=Value(0.0)
+        )
+        popularity = settings.SEARCH_FOLLOWER_WEIGHT * Log(10, F("followers_count") + 1)
+        return list(
+            users.annotate(score=prefix + popularity)
+            .order_by("-score", "username")
+            .values_list("id", "score")[:limit]
+        )
+
+
+class SqliteUserSearchIndex(UserSearchIndex):
+    def install(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+                "user_id UNINDEXED, username, first_name, last_name, bio, "
+                "tokenize='trigram')"
+            )
+
+    def uninstall(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} "
+                "(user_id, username, first_name, last_name, bio) "
+                "SELECT id, username, first_name, last_name, COALESCE(bio, '') "
+                f"FROM {User._meta.db_table}"
+            )
+            return cursor.rowcount
+
+    def update(self, user):
+        self.remove(user.id)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} "
+                "(user_id, username, first_name, last_name, bio) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                [
+                    user.id.hex,
+                    user.username,
+                    user.first_name,
+                    user.last_name,
+                    user.bio or "",
+                ],
+            )
+
+    def remove(self, user_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE user_id = %s", [user_id.hex]
+            )
+
+    def candidates(self, query, limit, exclude=None, include_admins=False):
+        if len(query) < 3:
+            return super().candidates(query, limit, exclude, include_admins)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT user_id, -bm25({SEARCH_TABLE}) "
+                "+ %s * LOG(10, users.followers_count + 1) AS score "
+                f"FROM {SEARCH_TABLE} JOIN {User._meta.db_table} users "
+                f"ON users.id = {SEARCH_TABLE}.user_id "
+                f"WHERE {SEARCH_TABLE} MATCH %s AND users.id != %s "
+                "AND (%s OR NOT users.is_admin) "
+                "ORDER BY score DESC, users.username LIMIT %s",
+                [
+                    settings.SEARCH_FOLLOWER_WEIGHT,
+                    '"{}"'.format(query.replace('"', '""')),
+                    exclude.hex if exclude else "",
+                    include_admins,
+                    limit,
+                ],
+            )
+            return cursor.fetchall()
+
+
+class PostgresUserSearchIndex(UserSearchIndex):
+    def index_name(self, field):
+        return f"{User._meta.db_table}_{field}_trgm"
+
+    def install(self):
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for field in SEARCH_FIELDS:
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {self.index_name(field)} "
+                    f"ON {User._meta.db_table} USING gin ({field} gin_trgm_ops)"
+                )
+
+    def uninstall(self):
+        with connection.cursor() as cursor:
+            for field in SEARCH_FIELDS:
+                cursor.execute(f"DROP INDEX IF EXISTS {self.index_name(field)}")
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            for field in SEARCH_FIELDS:
+                cursor.execute(f"REINDEX INDEX {self.index_name(field)}")
+        return super().rebuild()
+
+    def candidates(self, query, limit, exclude=None, include_admins=False):
+        pattern = f"%{escape_like(query)}%"
+        similarity = ", ".join(
+            f"similarity(COALESCE({field}, ''), %s)" for field in SEARCH_FIELDS
+        )
+        matches = " OR ".join(f"{field} ILIKE %s" for field in SEARCH_FIELDS)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT id, GREATEST({similarity}) "
+                "+ %s * LOG(10, followers_count + 1) AS score "
+                f"FROM {User._meta.db_table} WHERE ({matches}) "
+                "AND id IS DISTINCT FROM %s AND (%s OR NOT is_admin) "
+                "ORDER BY score DESC, username LIMIT %s",
+                [query] * len(SEARCH_FIELDS)
+                + [settings.SEARCH_FOLLOWER_WEIGHT]
+                + [pattern] * len(SEARCH_FIELDS)
+                + [exclude, include_admins, limit],
+            )
+            return cursor.fetchall()
+
+
+def get_user_search_index():
+    backends = {
+        "sqlite": SqliteUserSearchIndex,
+        "postgresql": PostgresUserSearchIndex,
+    }
+    return backends.get(connection.vendor, UserSearchIndex)()
+
+
+def search_users(query, exclude=None, include_admins=False, limit=None):
+    candidates = get_user_search_index().candidates(
+        query, limit or settings.SEARCH_CANDIDATES, exclude, include_admins
+    )
+    return [uuid.UUID(str(user_id)) for user_id, score in candidates]
@@ -0,0 +1,87 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from conversation.models import UserStatus
+from core.context_cache import bump_context
+from .autocomplete import user_deleted, user_saved
+from .models import Follow, FollowSuggestion
+from .search import SEARCH_FIELDS, get_user_search_index
+from .tasks import expire_neighbour_suggestions
+from .utils import expire_follow_suggestions
+
+User = get_user_model()
+
+AUTOCOMPLETE_FIELDS = ("username", "slug", "is_admin", "verified")
+
+
+@receiver(post_save, sender=User)
+def index_user(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or set(update_fields) & set(SEARCH_FIELDS):
+        get_user_search_index().update(instance)
+    if update_fields is None or set(update_fields) & set(AUTOCOMPLETE_FIELDS):
+        user_saved(instance)
+
+
+@receiver(post_delete, sender=User)
+def unindex_user(sender, instance, **kwargs):
+    get_user_search_index().remove(instance.id)
+    user_deleted(instance.id)
+
+
+def bump_follow_context(follow):
+    bump_context("follows", follow.follower_id, follow.following_id)
+    bump_context("profile", follow.follower_id, follow.following_id)
+    bump_context("stories", follow.follower_id)
+
+
+def expire_follow_neighbourhood(follow):
+    expire_follow_suggestions(follow.follower_id, follow.following_id)
+    transaction.on_commit(
+        lambda: expire_neighbour_suggestions.delay(
+            str(follow.follower_id), str(follow.following_id)
+        )
+    )
+
+
+@receiver(post_save, sender=Follow)
+def followed_suggestion(sender, instance, **kwargs):
+    FollowSuggestion.objects.filter(
+        user=instance.follower_id, suggested=instance.following_id
+    ).delete()
+    expire_follow_neighbourhood(instance)
+    bump_follow_context(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def unfollowed_suggestion(sender, instance, **kwargs):
+    expire_follow_neighbourhood(instance)
+    bump_follow_context(instance)
+
+
+@receiver(post_save, sender=UserStatus)
+def blocked_suggestion(sender, instance, **kwargs):
+    if instance.conversation.is_group:
+        return
+    participants = list(
+        instance.conversation.participants.values_list("id", flat=True)
+    )
+    if instance.status == "Block":
+        FollowSuggestion.objects.filter(
+            user__in=participants, suggested__in=participants
+        ).delete()
+    expire_follow_suggestions(*participants)
+    bump_context("follows", *participants)
+    bump_context("conversations", *participants)
+
+
+@receiver(post_delete, sender=UserStatus)
+def unblocked_suggestion(sender, instance, **kwargs):
+    if instance.conversation.is_group:
+        return
+    participants = list(
+        instance.conversation.participants.values_list("id", flat=True)
+    )
+    expire_follow_suggestions(*participants)
+    bump_context("follows", *participants)
+    bump_context("conversations", *participants)
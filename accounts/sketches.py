@@ -0,0 +1,39 @@
+import hashlib
+import math
+import zlib
+
+PRECISION = 12
+REGISTERS = 1 << PRECISION
+HASH_BITS = 64 - PRECISION
+
+
+class HyperLogLog:
+    def __init__(self, registers=None):
+        self.registers = bytearray(registers) if registers else bytearray(REGISTERS)
+
+    @classmethod
+    def load(cls, data):
+        return cls(zlib.decompress(data) if data else None)
+
+    def dump(self):
+        return zlib.compress(bytes(self.registers))
+
+    def add(self, value):
+        digest = hashlib.blake2b(str(value).encode(), digest_size=8).digest()
+        hashed = int.from_bytes(digest, "big")
+        index = hashed >> HASH_BITS
+        rank = HASH_BITS - (hashed & ((1 << HASH_BITS) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        alpha = 0.7213 / (1 + 1.079 / REGISTERS)
+        estimate = alpha * REGISTERS**2 / sum(2.0**-rank for rank in self.registers)
+        zeros = self.registers.count(0)
+        if zeros and estimate <= 2.5 * REGISTERS:
+            estimate = REGISTERS * math.log(REGISTERS / zeros)
+        return round(estimate)
@@ -0,0 +1,124 @@
+import numpy as np
+from billiard import Pool
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from conversation.models import UserStatus
+from core.context_cache import bump_context
+from .graph import FollowGraph, share_graph, walk_shard
+from .models import Follow, FollowSuggestion
+
+User = get_user_model()
+
+
+def id_keys(ids):
+    return np.fromiter((user_id.bytes for user_id in ids), dtype="S16")
+
+
+def id_rows(keys, ids):
+    rows = np.searchsorted(keys, ids)
+    found = rows < len(keys)
+    found[found] = keys[rows[found]] == ids[found]
+    return rows.astype(np.int32), found
+
+
+def load_follow_graph():
+    user_ids = list(User.objects.filter(is_active=True).values_list("id", flat=True))
+    keys = id_keys(user_ids)
+    order = np.argsort(keys, kind="stable")
+    user_ids = [user_ids[row] for row in order]
+    keys = keys[order]
+
+    follows = Follow.objects.order_by().values_list(
+        "follower_id", "following_id", "status"
+    )
+    edges = np.fromiter(
+        (
+            (follower_id.bytes, following_id.bytes, status == Follow.Status.ACCEPTED)
+            for follower_id, following_id, status in follows.iterator(
+                chunk_size=10000
+            )
+        ),
+        dtype=[("source", "S16"), ("target", "S16"), ("accepted", bool)],
+    )
+    sources, source_found = id_rows(keys, edges["source"])
+    targets, target_found = id_rows(keys, edges["target"])
+    valid = source_found & target_found
+
+    blocks = np.array(
+        [
+            (blocker.bytes, blocked.bytes)
+            for blocker, blocked in UserStatus.objects.filter(
+                status="Block", conversation__is_group=False
+            ).values_list("user_id", "conversation__participants")
+            if blocker != blocked
+        ],
+        dtype="S16",
+    ).reshape(-1, 2)
+    blockers, blocker_found = id_rows(keys, blocks[:, 0])
+    blockees, blockee_found = id_rows(keys, blocks[:, 1])
+    blocked = blocker_found & blockee_found
+
+    return FollowGraph(
+        user_ids,
+        sources[valid],
+        targets[valid],
+        edges["accepted"][valid],
+        np.stack([blockers[blocked], blockees[blocked]], axis=1),
+        settings.FOLLOW_SUGGESTIONS_PRIOR_WEIGHT,
+    )
+
+
+def rank_shards(graph, rows, limit):
+    chunk = settings.FOLLOW_GRAPH_CHUNK_SIZE
+    shards = [rows[start : start + chunk] for start in range(0, len(rows), chunk)]
+
+    if settings.FOLLOW_SUGGESTIONS_ENGINE == "mutual":
+        for shard in shards:
+            yield shard, graph.score(shard, limit)
+        return
+
+    walk = (
+        limit,
+        settings.FOLLOW_WALKS_PER_USER,
+        settings.FOLLOW_WALK_RESTART,
+        settings.FOLLOW_WALK_MAX_STEPS,
+    )
+    seeds = [shard[0] for shard in shards]
+    workers = settings.FOLLOW_SUGGESTIONS_WORKERS
+    if workers <= 1 or len(shards) <= 1:
+        for shard, seed in zip(shards, seeds):
+            yield shard, graph.walk(shard, *walk, seed)
+        return
+
+    with Pool(workers, initializer=share_graph, initargs=(graph,)) as pool:
+        results = pool.imap(
+            walk_shard, [(shard, *walk, seed) for shard, seed in zip(shards, seeds)]
+        )
+        yield from zip(shards, results)
+
+
+def store_follow_suggestions(graph, rows, limit=None):
+    limit = limit or settings.FOLLOW_SUGGESTIONS_SIZE
+    refreshed_at = timezone.now()
+
+    for shard, results in rank_shards(graph, rows, limit):
+        user_ids = [graph.user_ids[row] for row in shard]
+        with transaction.atomic():
+            FollowSuggestion.objects.filter(user__in=user_ids).delete()
+            FollowSuggestion.objects.bulk_create(
+                FollowSuggestion(
+                    user_id=user_id,
+                    suggested_id=graph.user_ids[candidate],
+                    score=score,
+                    mutual_count=mutual_count,
+                )
+                for user_id, suggestions in zip(user_ids, results)
+                for candidate, score, mutual_count in suggestions
+            )
+            User.objects.filter(id__in=user_ids).update(
+                suggestions_refreshed_at=refreshed_at
+            )
+        bump_context("follows", *user_ids)
+    return len(rows)
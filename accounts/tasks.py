@@ -0,0 +1,43 @@
+from datetime import timedelta
+from celery import shared_task
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import F, Q
+from django.utils import timezone
+from accounts.suggestions import load_follow_graph, store_follow_suggestions
+from accounts.utils import expire_follow_suggestions
+from accounts.visits import flush_profile_views
+
+User = get_user_model()
+
+
+@shared_task
+def refresh_follow_suggestions():
+    refreshed_before = timezone.now() - timedelta(
+        seconds=settings.FOLLOW_SUGGESTIONS_TTL
+    )
+    stale = list(
+        User.objects.filter(is_active=True)
+        .filter(
+            Q(suggestions_refreshed_at__isnull=True)
+            | Q(suggestions_refreshed_at__lt=refreshed_before)
+        )
+        .order_by(F("suggestions_refreshed_at").asc(nulls_first=True), "id")
+        .values_list("id", flat=True)[: settings.FOLLOW_SUGGESTIONS_BATCH_SIZE]
+    )
+    if not stale:
+        return 0
+
+    graph = load_follow_graph()
+    rows = [graph.index[user_id] for user_id in stale if user_id in graph.index]
+    return store_follow_suggestions(graph, rows)
+
+
+@shared_task
+def expire_neighbour_suggestions(*user_ids):
+    expire_follow_suggestions(*user_ids, neighbours=True)
+
+
+@shared_task
+def flush_profile_view_buffer():
+    return flush_profile_views()
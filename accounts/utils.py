@@ -1,50 +1,213 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Count
-from collections import Counter
-from .models import Follow
+from django.core.cache import cache
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from datetime import datetime
+from conversation.models import Conversation
+from conversation.utils import dm_key
+from core.context_cache import bump_context, context_version
+from core.utils import cursor_id, encode_cursor, decode_cursor
+from .models import Follow, FollowSuggestion
 
 
 User = get_user_model()
 
 
-def generate_follow_suggestions(user, max_results=5):
-    suggestions = []
+def expire_follow_suggestions(*user_ids, neighbours=False):
+    users = Q(id__in=user_ids)
+    if neighbours:
+        accepted = Follow.objects.filter(status=Follow.Status.ACCEPTED)
+        users |= Q(
+            id__in=accepted.filter(following__in=user_ids).values("follower_id")
+        ) | Q(id__in=accepted.filter(follower__in=user_ids).values("following_id"))
+    User.objects.filter(users).update(suggestions_refreshed_at=None)
 
-    UIfollowing = user.following.values_list("following_id", flat=True)
 
-    if UIfollowing.exists():
-        FriendsOfUsers = (
+def suggested_users(user):
+    return (
+        User.objects.filter(suggested_to__user=user)
+        .annotate(mutual_count=F("suggested_to__mutual_count"))
+        .order_by("-suggested_to__score")
+    )
+
+
+def mutual_follow_count(viewer, user="pk"):
+    return Coalesce(
+        Subquery(
             Follow.objects.filter(
-                follower__in=UIfollowing, status=Follow.Status.PENDING
+                follower__in=Follow.objects.filter(
+                    follower=viewer, status=Follow.Status.ACCEPTED
+                ).values("following_id"),
+                following=OuterRef(user),
+                status=Follow.Status.ACCEPTED,
             )
-            .values_list("following", flat=True)
-            .exclude(following=user)
+            .order_by()
+            .values("following")
+            .annotate(total=Count("id"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def with_follow_status(users, viewer):
+    return users.annotate(
+        follow_status=Subquery(
+            Follow.objects.filter(follower=viewer, following=OuterRef("pk")).values(
+                "status"
+            )[:1]
         )
+    )
+
+
+def adjust_follow_counts(follower_id, following_id, delta):
+    User.objects.filter(id=follower_id).update(
+        following_count=Greatest(F("following_count") + delta, 0)
+    )
+    User.objects.filter(id=following_id).update(
+        followers_count=Greatest(F("followers_count") + delta, 0)
+    )
+    bump_context("profile", follower_id, following_id)
+
+
+def follow_count_totals():
+    accepted = Follow.objects.filter(status=Follow.Status.ACCEPTED).order_by()
+    return {
+        "followers_count": dict(
+            accepted.values_list("following").annotate(total=Count("id"))
+        ),
+        "following_count": dict(
+            accepted.values_list("follower").annotate(total=Count("id"))
+        ),
+    }
+
+
+def resolve_relationships(viewer, user_ids):
+    user_ids = set(user_ids)
+    users = (
+        User.objects.filter(id__in=user_ids)
+        .annotate(mutual_count=mutual_follow_count(viewer))
+        .values_list("id", "followers_count", "following_count", "mutual_count")
+    )
+    relationships = {
+        user_id: {
+            "is_following": False,
+            "is_follower": False,
+            "is_pending": False,
+            "followers_count": followers_count,
+            "following_count": following_count,
+            "mutual_count": mutual_count,
+        }
+        for user_id, followers_count, following_count, mutual_count in users
+    }
+
+    edges = Follow.objects.filter(
+        Q(follower=viewer, following__in=user_ids)
+        | Q(following=viewer, follower__in=user_ids)
+    ).values_list("follower_id", "following_id", "status")
+
+    for follower_id, following_id, status in edges:
+        if follower_id == viewer.id and following_id in relationships:
+            if status == Follow.Status.ACCEPTED:
+                relationships[following_id]["is_following"] = True
+            else:
+                relationships[following_id]["is_pending"] = True
+        if (
+            following_id == viewer.id
+            and follower_id in relationships
+            and status == Follow.Status.ACCEPTED
+        ):
+            relationships[follower_id]["is_follower"] = True
+
+    return relationships
+
 
-        if FriendsOfUsers.exists():
-            counter = Counter(FriendsOfUsers)
-            top_suggestions = [
-                user_id for user_id, count in counter.most_common(max_results)
-            ]
-            suggestions.extend(top_suggestions)
-
-        if len(suggestions) < max_results:
-            remaining = max_results - len(suggestions)
-            popular_user = (
-                User.objects.filter(id__in=UIfollowing)
-                .annotate(follower_count=Count("followers"))
-                .order_by("-follower_count")
-                .exclude(id=user.id)[:remaining]
+def profile_summary(viewer, profile):
+    key = "profile_summary:{}:{}:{}:{}".format(
+        viewer.pk,
+        profile.pk,
+        context_version("profile", viewer.pk),
+        context_version("profile", profile.pk),
+    )
+    summary = cache.get(key)
+    if summary is None:
+        follows = Follow.objects.filter(status=Follow.Status.ACCEPTED)
+        summary = (
+            User.objects.filter(pk=profile.pk)
+            .annotate(
+                is_following=Exists(
+                    follows.filter(follower=viewer, following=OuterRef("pk"))
+                ),
+                is_follower=Exists(
+                    follows.filter(follower=OuterRef("pk"), following=viewer)
+                ),
+                is_pending=Exists(
+                    Follow.objects.filter(
+                        follower=viewer,
+                        following=OuterRef("pk"),
+                        status=Follow.Status.PENDING,
+                    )
+                ),
+                conversation_id=Subquery(
+                    Conversation.objects.filter(
+                        dm_key=dm_key(viewer.pk, profile.pk)
+                    ).values("id")
+                ),
             )
-            suggestions.extend(popular_user.values_list("id", flat=True))
-
-    if len(suggestions) < max_results:
-        remaining = max_results - len(suggestions)
-        popular_users = (
-            User.objects.exclude(id=user.id)
-            .annotate(high_followers=Count("followers"))
-            .order_by("-high_followers")[:remaining]
+            .values(
+                "is_following",
+                "is_follower",
+                "is_pending",
+                "followers_count",
+                "following_count",
+                "conversation_id",
+            )
+            .get()
         )
-        suggestions.extend(popular_users.values_list("id", flat=True))
+        cache.set(key, summary, settings.PROFILE_SUMMARY_TIMEOUT)
+    return summary
+
+
+def follow_page(follows, cursor=None):
+    follows = follows.order_by("-created_at", "-id")
+
+    if cursor:
+        created_at, follow_id = decode_cursor(cursor)
+        created_at = datetime.fromisoformat(created_at)
+        follow_id = cursor_id(follow_id)
+
+        follows = follows.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=follow_id)
+        )
+
+    page = list(follows[: settings.FOLLOW_PAGE_SIZE + 1])
+
+    next_cursor = None
+    if len(page) > settings.FOLLOW_PAGE_SIZE:
+        page = page[: settings.FOLLOW_PAGE_SIZE]
+        next_cursor = encode_cursor(page[-1].created_at.isoformat(), page[-1].id)
+
+    return page, next_cursor
+
+
+def viewers_page(profile, cursor=None):
+    visits = (
+        User.viewers.through.objects.filter(from_user=profile)
+        .select_related("to_user")
+        .order_by("-id")
+    )
+
+    if cursor:
+        (visit_id,) = decode_cursor(cursor)
+        visits = visits.filter(id__lt=cursor_id(visit_id))
+
+    page = list(visits[: settings.FOLLOW_PAGE_SIZE + 1])
+
+    next_cursor = None
+    if len(page) > settings.FOLLOW_PAGE_SIZE:
+        page = page[: settings.FOLLOW_PAGE_SIZE]
+        next_cursor = encode_cursor(page[-1].id)
 
-    return User.objects.filter(id__in=suggestions).exclude(id__in=UIfollowing)
+    return [visit.to_user for visit in page], next_cursor
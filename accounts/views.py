@@ -1,9 +1,20 @@
 from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
 from django.contrib.auth.decorators import login_required
-from accounts.utils import generate_follow_suggestions
+from accounts.utils import (
+    adjust_follow_counts,
+    follow_page,
+    profile_summary,
+    resolve_relationships,
+    suggested_users,
+    viewers_page,
+)
+from accounts.visits import record_profile_view, unique_visitors, viewers_count
+from conversation.utils import direct_conversation
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.db.models import Q, Prefetch
 from django.core.mail import send_mail
 from django.contrib import messages
@@ -13,6 +24,8 @@ from accounts.models import Follow
 from conversation.models import *
 from accounts.forms import *
 from core.models import *
+from core.counters import page_comments, with_live_like_counts, with_viewer_likes
+from core.threads import with_thread_replies
 
 import stripe
 
@@ -70,7 +83,7 @@ def stripe_webhook(request):
         user_id = session["metadata"]["user_id"]
         user = User.objects.get(id=user_id)
         user.verified = True
-        user.save()
+        user.save(update_fields=["verified"])
 
     return HttpResponse(status=200)
 
@@ -86,7 +99,7 @@ def videos(request, slug):
                 ),
                 Prefetch(
                     "comments",
-                    queryset=Comment.objects.filter(parent=None),
+                    queryset=Comment.objects.filter(parent=None).select_related("user"),
                     to_attr="none_parent_comment",
                 ),
             )
@@ -97,20 +110,19 @@ def videos(request, slug):
 
     else:
         posts = []
+    posts = list(posts)
+    with_live_like_counts(posts + page_comments(posts))
+    with_viewer_likes(request.user, posts + page_comments(posts))
+    with_thread_replies(page_comments(posts))
     return render(request, "accounts/videos.html", {"profile": user, "posts": posts})
 
 
 @login_required
 def profile(request, slug):
     user = get_object_or_404(User, slug=slug)
-    conversation = (
-        Conversation.objects.filter(Q(participants=user))
-        .filter(Q(participants=request.user))
-        .first()
-    )
 
     if request.user != user and request.user.is_admin == False:
-        user.viewers.add(request.user)
+        record_profile_view(user, request.user)
 
     if user.is_private == True or request.user == user:
 
@@ -118,7 +130,7 @@ def profile(request, slug):
             Post.objects.prefetch_related(
                 Prefetch(
                     "comments",
-                    queryset=Comment.objects.filter(parent=None),
+                    queryset=Comment.objects.filter(parent=None).select_related("user"),
                     to_attr="none_parent_comment",
                 )
             )
@@ -128,35 +140,23 @@ def profile(request, slug):
 
     else:
         posts = []
+    posts = list(posts)
+    with_live_like_counts(posts + page_comments(posts))
+    with_viewer_likes(request.user, posts + page_comments(posts))
+    with_thread_replies(page_comments(posts))
 
-    is_following = Follow.objects.filter(
-        follower=request.user, following=user, status=Follow.Status.ACCEPTED
-    ).exists()
-
-    is_follower = Follow.objects.filter(
-        follower=user, following=request.user, status=Follow.Status.ACCEPTED
-    ).exists()
-
-    is_pending = Follow.objects.filter(
-        follower=request.user, following=user, status=Follow.Status.PENDING
-    ).exists()
-
-    FollowingCount = Follow.objects.filter(
-        follower=user, status=Follow.Status.ACCEPTED
-    ).count()
-    FollowersCount = Follow.objects.filter(
-        following=user, status=Follow.Status.ACCEPTED
-    ).count()
+    summary = profile_summary(request.user, user)
 
     context = {
         "profile": user,
         "posts": posts,
-        "conversation": conversation,
-        "is_following": is_following,
-        "is_follower": is_follower,
-        "is_pending": is_pending,
-        "FollowingCount": FollowingCount,
-        "FollowersCount": FollowersCount,
+        "conversation_id": summary["conversation_id"],
+        "is_following": summary["is_following"],
+        "is_follower": summary["is_follower"],
+        "is_pending": summary["is_pending"],
+        "FollowingCount": summary["following_count"],
+        "FollowersCount": summary["followers_count"],
+        "ViewersCount": viewers_count(user) if request.user == user else None,
         "stripe_public_key": "pk_test_51Q3xnYH4IAM7G10vw0mAzfEqkajCpWH5PuIrYJziEdvBURYUnHzQXitK8ntYVdqoGknPH0fw9p8cHoErROxU1eGu00xRPC5XiA",
     }
     return render(request, "accounts/profile.html", context)
@@ -168,7 +168,10 @@ def settings(request):
     if request.method == "POST":
         form = UserForm(request.POST, request.FILES, instance=user)
         if form.is_valid():
-            form.save()
+            user = form.save(commit=False)
+            user.save(
+                update_fields=[name for name in form.changed_data if name != "email"]
+            )
             messages.success(request, "Your Information Has Been Updated")
             return redirect("settings")
     else:
@@ -178,7 +181,7 @@ def settings(request):
 
 @login_required
 def follow_suggestions(request):
-    users = generate_follow_suggestions(request.user)
+    users = suggested_users(request.user)
     return render(request, "accounts/suggestions.html", {"users": users})
 
 
@@ -186,62 +189,51 @@ def follow_suggestions(request):
 def pending_requests(request):
     PendingList = Follow.objects.filter(
         following=request.user, status=Follow.Status.PENDING
-    )
-
-    FollowersCount = 0
+    ).select_related("follower")
 
+    relationships = resolve_relationships(
+        request.user, [i.follower_id for i in PendingList]
+    )
     for i in PendingList:
-        FollowersCount = Follow.objects.filter(
-            following=i.follower, status=Follow.Status.ACCEPTED
-        ).count()
+        i.relationship = relationships[i.follower_id]
 
-    context = {"FollowersCount": FollowersCount, "PendingList": PendingList}
+    context = {"PendingList": PendingList}
     return render(request, "accounts/pending-requests.html", context)
 
 
+def list_page(request, template, context):
+    html = render_to_string(template, context, request=request)
+    return JsonResponse({"html": html, "next_cursor": context["next_cursor"]})
+
+
 @login_required
 def user_following(request, slug):
     user = get_object_or_404(User, slug=slug)
     if user.show_following == True or request.user == user:
-        following = Follow.objects.filter(follower=user, status=Follow.Status.ACCEPTED)
-
-        following_list = []
-        for i in following:
-
-            is_following = Follow.objects.filter(
-                follower=request.user,
-                following=i.following,
-                status=Follow.Status.ACCEPTED,
-            ).exists()
-
-            is_follower = Follow.objects.filter(
-                following=request.user,
-                follower=i.following,
-                status=Follow.Status.ACCEPTED,
-            ).exists()
-
-            followers_count = Follow.objects.filter(
-                following=i.following, status=Follow.Status.ACCEPTED
-            )
-
-            following_count = Follow.objects.filter(
-                follower=i.following, status=Follow.Status.ACCEPTED
+        try:
+            following, next_cursor = follow_page(
+                Follow.objects.filter(
+                    follower=user, status=Follow.Status.ACCEPTED
+                ).select_related("following"),
+                request.GET.get("cursor"),
             )
+        except ValueError:
+            return HttpResponseBadRequest("Invalid cursor")
 
-            following_list.append(
-                {
-                    "user": i.following,
-                    "is_following": is_following,
-                    "followers_count": followers_count,
-                    "following_count": following_count,
-                    "is_follower": is_follower,
-                }
-            )
+        relationships = resolve_relationships(
+            request.user, [i.following_id for i in following]
+        )
+        following_list = [
+            {"user": i.following, **relationships[i.following_id]} for i in following
+        ]
 
         context = {
             "following_list": following_list,
             "user": user,
+            "next_cursor": next_cursor,
         }
+        if "cursor" in request.GET:
+            return list_page(request, "accounts/following-items.html", context)
         return render(request, "accounts/following.html", context)
     else:
         return redirect(f"/accounts/{slug}/")
@@ -251,45 +243,30 @@ def user_following(request, slug):
 def user_followers(request, slug):
     user = get_object_or_404(User, slug=slug)
     if user.show_followers == True or request.user == user:
-        followers = Follow.objects.filter(following=user, status=Follow.Status.ACCEPTED)
-
-        followers_list = []
-
-        for i in followers:
-            is_following = Follow.objects.filter(
-                follower=request.user,
-                following=i.follower,
-                status=Follow.Status.ACCEPTED,
-            ).exists()
-
-            is_follower = Follow.objects.filter(
-                following=request.user,
-                follower=i.follower,
-                status=Follow.Status.ACCEPTED,
-            ).exists()
-
-            followers_count = Follow.objects.filter(
-                following=i.follower, status=Follow.Status.ACCEPTED
-            ).count()
-
-            following_count = Follow.objects.filter(
-                follower=i.follower, status=Follow.Status.ACCEPTED
-            ).count()
-
-            followers_list.append(
-                {
-                    "followers_count": followers_count,
-                    "following_count": following_count,
-                    "user": i.follower,
-                    "is_follower": is_follower,
-                    "is_following": is_following,
-                }
+        try:
+            followers, next_cursor = follow_page(
+                Follow.objects.filter(
+                    following=user, status=Follow.Status.ACCEPTED
+                ).select_related("follower"),
+                request.GET.get("cursor"),
             )
+        except ValueError:
+            return HttpResponseBadRequest("Invalid cursor")
+
+        relationships = resolve_relationships(
+            request.user, [i.follower_id for i in followers]
+        )
+        followers_list = [
+            {"user": i.follower, **relationships[i.follower_id]} for i in followers
+        ]
 
         context = {
             "user": user,
             "followers_list": followers_list,
+            "next_cursor": next_cursor,
         }
+        if "cursor" in request.GET:
+            return list_page(request, "accounts/followers-items.html", context)
         return render(request, "accounts/followers.html", context)
     else:
         return redirect(f"/accounts/{slug}/")
@@ -315,23 +292,16 @@ def send_follow(request, id):
         elif existing_request.status == Follow.Status.PENDING:
             messages.warning(request, "Request already pending")
 
-    elif user.check_followers == False or request.user.is_admin:
-        Follow.objects.create(
-            follower=request.user, following=user, status=Follow.Status.ACCEPTED
-        )
-
-        follower = User.objects.get(id=request.user.id)
-        following = User.objects.get(id=user.id)
+        return redirect(url)
 
-        conversation = (
-            Conversation.objects.filter(Q(participants=user)).filter(
-                Q(participants=request.user)
+    elif user.check_followers == False or request.user.is_admin:
+        with transaction.atomic():
+            Follow.objects.create(
+                follower=request.user, following=user, status=Follow.Status.ACCEPTED
             )
-        ).exists()
+            adjust_follow_counts(request.user.id, user.id, 1)
 
-        if not conversation:
-            conversation = Conversation.objects.create()
-            conversation.participants.add(follower, following)
+        direct_conversation(request.user, user)
 
         messages.success(request, f"You are now following {user.username}")
         return redirect(url)
@@ -355,7 +325,11 @@ def user_unfollow(request, id):
         return redirect("profile", slug=user.slug)
 
     elif UserUnfollow.exists():
-        UserUnfollow.delete()
+        with transaction.atomic():
+            unfollowed, _ = UserUnfollow.filter(status=Follow.Status.ACCEPTED).delete()
+            UserUnfollow.delete()
+            if unfollowed:
+                adjust_follow_counts(request.user.id, user.id, -1)
         messages.success(request, f"You have unfollowed {user.username}")
     else:
         messages.warning(request, f"You were not following {user.username}")
@@ -367,12 +341,15 @@ def user_unfollow(request, id):
 def remove(request, id):
     url = request.META.get("HTTP_REFERER")
     user = get_object_or_404(User, id=id)
-    follow = get_object_or_404(
-        Follow,
-        follower=user,
-        following=request.user,
-    )
-    follow.delete()
+    with transaction.atomic():
+        follow = get_object_or_404(
+            Follow.objects.select_for_update(),
+            follower=user,
+            following=request.user,
+        )
+        follow.delete()
+        if follow.status == Follow.Status.ACCEPTED:
+            adjust_follow_counts(user.id, request.user.id, -1)
     messages.success(request, f"Successfully Removed {follow.follower.username}")
     return redirect(url)
 
@@ -380,29 +357,33 @@ def remove(request, id):
 @login_required
 def respond_to_follow(request, id, action):
     url = request.META.get("HTTP_REFERER")
-    follow_request = get_object_or_404(Follow, id=id)
 
     if action == "accept":
-        follow_request.status = "accepted"
-        follow_request.save()
-
-        follower = User.objects.get(id=follow_request.follower.id)
-        following = User.objects.get(id=follow_request.following.id)
-
-        conversation = (
-            Conversation.objects.filter(Q(participants=follower)).filter(
-                Q(participants=follower)
+        with transaction.atomic():
+            follow_request = get_object_or_404(
+                Follow.objects.select_for_update(), id=id, following=request.user
             )
-        ).exists()
+            if follow_request.status == Follow.Status.PENDING:
+                follow_request.status = Follow.Status.ACCEPTED
+                follow_request.save()
+                adjust_follow_counts(
+                    follow_request.follower_id, follow_request.following_id, 1
+                )
 
-        if not conversation:
-            conversation = Conversation.objects.create()
-            conversation.participants.add(follower, following)
+        direct_conversation(follow_request.follower, follow_request.following)
 
         messages.success(request, "Follow request accepted")
 
     elif action == "cancel":
-        follow_request.delete()
+        with transaction.atomic():
+            follow_request = get_object_or_404(
+                Follow.objects.select_for_update(), id=id, following=request.user
+            )
+            follow_request.delete()
+            if follow_request.status == Follow.Status.ACCEPTED:
+                adjust_follow_counts(
+                    follow_request.follower_id, follow_request.following_id, -1
+                )
 
     return redirect(url)
 
@@ -434,29 +415,26 @@ def viewers_list(request, slug):
 
     if request.user.verified or request.user.is_admin:
         profile = get_object_or_404(User, slug=slug)
-        visitors = profile.viewers.all()
-
-        following_ids = Follow.objects.filter(
-            follower=profile, status=Follow.Status.ACCEPTED
-        ).values_list("following_id", flat=True)
-
-        follower_ids = Follow.objects.filter(
-            following=profile, status=Follow.Status.ACCEPTED
-        ).values_list("follower_id", flat=True)
-
-        visitor_list = []
-        for i in visitors:
-            is_following = i.id in following_ids
-            is_follower = i.id in follower_ids
-
-            visitor_list.append(
-                {
-                    "viewer": i,
-                    "is_follower": is_follower,
-                    "is_following": is_following,
-                }
-            )
-        context = {"visitor_list": visitor_list, "profile": profile}
+        try:
+            visitors, next_cursor = viewers_page(profile, request.GET.get("cursor"))
+        except ValueError:
+            return HttpResponseBadRequest("Invalid cursor")
+
+        relationships = resolve_relationships(
+            profile, [visitor.id for visitor in visitors]
+        )
+        visitor_list = [
+            {"viewer": visitor, **relationships[visitor.id]} for visitor in visitors
+        ]
+        context = {
+            "visitor_list": visitor_list,
+            "profile": profile,
+            "next_cursor": next_cursor,
+        }
+        if "cursor" in request.GET:
+            return list_page(request, "accounts/viewers-items.html", context)
+        context["unique_visitors"] = unique_visitors(profile)
+        context["viewers_count"] = viewers_count(profile)
         return render(request, "accounts/viewers-list.html", context)
 
     else:
@@ -0,0 +1,130 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from core.utils import get_redis
+from .models import ProfileVisitDay
+from .sketches import HyperLogLog
+
+User = get_user_model()
+
+PROFILE_VIEWS_KEY = "profile_views:pending"
+FLUSHING_PROFILE_VIEWS_KEY = "profile_views:flushing"
+
+
+def viewers_count_key(profile_id):
+    return f"profile_views:count:{profile_id}"
+
+
+def viewers_count(profile):
+    return cache.get_or_set(
+        viewers_count_key(profile.pk),
+        profile.viewers.count,
+        settings.PROFILE_SUMMARY_TIMEOUT,
+    )
+
+
+def record_profile_view(profile, viewer):
+    day = timezone.localdate()
+
+    redis = get_redis()
+    if settings.PROFILE_VIEWS_BUFFERED and redis is not None:
+        redis.sadd(PROFILE_VIEWS_KEY, f"{profile.pk}:{viewer.pk}:{day.isoformat()}")
+    elif cache.add(
+        f"profile_views:seen:{profile.pk}:{viewer.pk}:{day.isoformat()}",
+        1,
+        settings.PROFILE_VIEWS_SEEN_TIMEOUT,
+    ):
+        store_profile_views([(profile.pk, viewer.pk, day)])
+
+
+def flush_profile_views():
+    redis = get_redis()
+    if redis is None:
+        return 0
+
+    if not redis.exists(FLUSHING_PROFILE_VIEWS_KEY):
+        if not redis.exists(PROFILE_VIEWS_KEY):
+            return 0
+        redis.rename(PROFILE_VIEWS_KEY, FLUSHING_PROFILE_VIEWS_KEY)
+
+    views = []
+    for member in redis.smembers(FLUSHING_PROFILE_VIEWS_KEY):
+        profile_id, viewer_id, day = member.decode().split(":")
+        views.append((profile_id, viewer_id, date.fromisoformat(day)))
+
+    stored = store_profile_views(views)
+    redis.delete(FLUSHING_PROFILE_VIEWS_KEY)
+    return stored
+
+
+def store_profile_views(views):
+    views = {
+        (str(profile_id), str(viewer_id), day) for profile_id, viewer_id, day in views
+    }
+    if not views:
+        return 0
+
+    Viewer = User.viewers.through
+    Viewer.objects.bulk_create(
+        {
+            (profile_id, viewer_id): Viewer(
+                from_user_id=profile_id, to_user_id=viewer_id
+            )
+            for profile_id, viewer_id, day in views
+        }.values(),
+        ignore_conflicts=True,
+    )
+    cache.delete_many(
+        [viewers_count_key(profile_id) for profile_id, viewer_id, day in views]
+    )
+
+    visitors = defaultdict(set)
+    for profile_id, viewer_id, day in views:
+        visitors[profile_id, day].add(viewer_id)
+
+    with transaction.atomic():
+        ProfileVisitDay.objects.bulk_create(
+            [
+                ProfileVisitDay(profile_id=profile_id, day=day)
+                for profile_id, day in visitors
+            ],
+            ignore_conflicts=True,
+        )
+        visit_days = ProfileVisitDay.objects.select_for_update().filter(
+            profile__in={profile_id for profile_id, day in visitors},
+            day__in={day for profile_id, day in visitors},
+        )
+
+        changed = []
+        for visit_day in visit_days:
+            viewer_ids = visitors.get((str(visit_day.profile_id), visit_day.day))
+            if not viewer_ids:
+                continue
+            sketch = HyperLogLog.load(visit_day.sketch)
+            for viewer_id in viewer_ids:
+                sketch.add(viewer_id)
+            visit_day.sketch = sketch.dump()
+            visit_day.visitors = sketch.count()
+            changed.append(visit_day)
+
+        ProfileVisitDay.objects.bulk_update(changed, ["sketch", "visitors"])
+    return len(views)
+
+
+def unique_visitors(profile, periods=(1, 7, 30)):
+    today = timezone.localdate()
+    visit_days = ProfileVisitDay.objects.filter(
+        profile=profile, day__gt=today - timedelta(days=max(periods))
+    ).values_list("day", "sketch")
+
+    sketches = {period: HyperLogLog() for period in periods}
+    for day, sketch in visit_days:
+        sketch = HyperLogLog.load(sketch)
+        for period, merged in sketches.items():
+            if day > today - timedelta(days=period):
+                merged.merge(sketch)
+    return {period: merged.count() for period, merged in sketches.items()}
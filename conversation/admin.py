@@ -16,7 +16,14 @@ class UserStatusAdmin(admin.ModelAdmin):
     list_per_page = 20
 
 
+class ConversationMemberAdmin(admin.ModelAdmin):
+    list_display = ["conversation", "user", "role", "unread_count", "muted", "blocked"]
+    raw_id_fields = ["last_read_message"]
+    list_per_page = 20
+
+
 admin.site.register(UserStatus, UserStatusAdmin)
+admin.site.register(ConversationMember, ConversationMemberAdmin)
 admin.site.register(Message, MessageAdmin)
 admin.site.register(MessageAttachment)
 admin.site.register(Conversation)
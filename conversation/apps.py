@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ConversationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'conversation'
+
+    def ready(self):
+        import conversation.signals
@@ -1,15 +1,39 @@
 from .models import *
-from django.db.models import (
-    Prefetch,
-    Max,
-    Count,
-    Q,
-    When,
-    Case,
-    Value,
-    IntegerField,
-    BooleanField,
-)
+from core.context_cache import ContextSection
+from django.db.models import F
+
+
+def conversation_context(user):
+    memberships = (
+        ConversationMember.objects.filter(user=user)
+        .select_related("conversation")
+        .prefetch_related("conversation__participants")
+        .order_by(F("last_message_at").desc(nulls_last=True))
+    )
+
+    block_chats = UserStatus.objects.filter(
+        status="Block",
+        user=user,
+        conversation__participants=user,
+    )
+
+    UserChats = []
+    inbox_count = 0
+    for member in memberships:
+        chat = member.conversation
+        chat.unread_count = member.unread_count
+        chat.chat_partner = next(
+            (i for i in chat.participants.all() if i.pk != user.pk), None
+        )
+        UserChats.append(chat)
+        if not member.blocked and not member.muted:
+            inbox_count += member.unread_count
+
+    return {
+        "UserChats": UserChats,
+        "inbox_count": inbox_count,
+        "block_count": block_chats.count(),
+    }
 
 
 def conversations_count(request):
@@ -17,69 +41,8 @@ def conversations_count(request):
         return {}
     else:
         if request.user.is_authenticated:
-            inbox = (
-                Message.objects.annotate(
-                    is_unread_for_user=Case(
-                        When(
-                            conversation__is_group=True, then=~Q(read_by=request.user)
-                        ),
-                        When(conversation__is_group=False, then=Q(read=False)),
-                        default=Value(False),
-                        output_field=BooleanField(),
-                    )
-                )
-                .filter(~Q(sender=request.user), is_unread_for_user=True)
-                .exclude(conversation__conversation_status__status="Block")
-            )
-
-            block_chats = UserStatus.objects.filter(
-                status="Block",
-                user=request.user,
-                conversation__participants=request.user,
-            )
-
-            UserMessages = Message.objects.filter(
-                conversation__participants=request.user
-            ).select_related("sender")
-
-            UserChats = (
-                Conversation.objects.prefetch_related(
-                    Prefetch("messages", queryset=UserMessages)
-                )
-                .filter(participants=request.user)
-                .annotate(
-                    latest_message=Max("messages__timestamp"),
-                    unread_count=Case(
-                        When(
-                            is_group=True,
-                            then=Count(
-                                "messages",
-                                filter=~Q(messages__sender=request.user)
-                                & ~Q(messages__read_by=request.user),
-                                distinct=True,
-                            ),
-                        ),
-                        When(
-                            is_group=False,
-                            then=Count(
-                                "messages",
-                                filter=~Q(messages__sender=request.user)
-                                & Q(messages__read=False),
-                                distinct=True,
-                            ),
-                        ),
-                        default=Value(0),
-                        output_field=IntegerField(),
-                    ),
-                )
-                .order_by("-latest_message")
-                .distinct(),
-            )
-
-            return {
-                "UserChats": UserChats,
-                "inbox": inbox,
-                "block_chats": block_chats,
-            }
+            return ContextSection(
+                "conversations", request.user, conversation_context
+            ).lazy("UserChats", "inbox_count", "block_count")
         else:
             return {}
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:13
+
+import hashlib
+from collections import defaultdict
+from django.db import migrations, models
+
+
+def backfill_dm_keys(apps, schema_editor):
+    Conversation = apps.get_model("conversation", "Conversation")
+    Participant = Conversation.participants.through
+
+    participants = defaultdict(list)
+    for conversation_id, user_id in Participant.objects.filter(
+        conversation__is_group=False
+    ).values_list("conversation_id", "user_id"):
+        participants[conversation_id].append(str(user_id))
+
+    keyed = {}
+    for conversation in Conversation.objects.filter(is_group=False).order_by(
+        "updated_at"
+    ):
+        users = participants.get(conversation.id, [])
+        if len(users) == 2:
+            pair = ":".join(sorted(users))
+            keyed[hashlib.sha256(pair.encode()).hexdigest()] = conversation
+
+    for key, conversation in keyed.items():
+        conversation.dm_key = key
+    Conversation.objects.bulk_update(keyed.values(), ["dm_key"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conversation', '0013_message_read_by_alter_message_sender'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='dm_key',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+        migrations.RunPython(backfill_dm_keys, migrations.RunPython.noop),
+    ]
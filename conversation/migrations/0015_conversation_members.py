@@ -0,0 +1,108 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:17
+
+import django.db.models.deletion
+from collections import Counter
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Max
+
+
+def backfill_members(apps, schema_editor):
+    Conversation = apps.get_model("conversation", "Conversation")
+    ConversationMember = apps.get_model("conversation", "ConversationMember")
+    Message = apps.get_model("conversation", "Message")
+    UserStatus = apps.get_model("conversation", "UserStatus")
+
+    groups = set(
+        Conversation.objects.filter(is_group=True).values_list("id", flat=True)
+    )
+    admins = set(
+        Conversation.admin.through.objects.values_list("conversation_id", "user_id")
+    )
+    blocked = set(
+        UserStatus.objects.filter(status="Block").values_list(
+            "conversation_id", "user_id"
+        )
+    )
+    last_message_at = dict(
+        Message.objects.order_by()
+        .values_list("conversation_id")
+        .annotate(latest=Max("timestamp"))
+    )
+
+    sent, unread_sent = Counter(), Counter()
+    totals = (
+        Message.objects.order_by()
+        .values_list("conversation_id", "sender_id", "read")
+        .annotate(total=Count("id"))
+    )
+    for conversation_id, sender_id, read, total in totals:
+        sent[conversation_id, sender_id] += total
+        sent[conversation_id] += total
+        if not read:
+            unread_sent[conversation_id, sender_id] += total
+            unread_sent[conversation_id] += total
+
+    read_by_others = Counter()
+    reads = (
+        Message.read_by.through.objects.exclude(message__sender=F("user"))
+        .order_by()
+        .values_list("message__conversation_id", "user_id")
+        .annotate(total=Count("id"))
+    )
+    for conversation_id, user_id, total in reads:
+        read_by_others[conversation_id, user_id] += total
+
+    members = []
+    participants = Conversation.participants.through.objects.values_list(
+        "conversation_id", "user_id"
+    )
+    for conversation_id, user_id in participants.iterator(chunk_size=2000):
+        key = (conversation_id, user_id)
+        if conversation_id in groups:
+            unread = sent[conversation_id] - sent[key] - read_by_others[key]
+        else:
+            unread = unread_sent[conversation_id] - unread_sent[key]
+        members.append(
+            ConversationMember(
+                conversation_id=conversation_id,
+                user_id=user_id,
+                role="admin" if key in admins else "member",
+                last_message_at=last_message_at.get(conversation_id),
+                unread_count=max(unread, 0),
+                blocked=key in blocked,
+            )
+        )
+    ConversationMember.objects.bulk_create(
+        members, batch_size=500, ignore_conflicts=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conversation', '0014_conversation_dm_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversationMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('member', 'Member'), ('admin', 'Admin')], default='member', max_length=10)),
+                ('last_message_at', models.DateTimeField(blank=True, null=True)),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('muted', models.BooleanField(default=False)),
+                ('blocked', models.BooleanField(default=False)),
+                ('conversation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='members', to='conversation.conversation')),
+                ('last_read_message', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='conversation.message')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversation_memberships', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-last_message_at'], name='conversatio_user_id_8d6256_idx')],
+                'constraints': [models.UniqueConstraint(fields=('conversation', 'user'), name='unique_conversation_member')],
+            },
+        ),
+        migrations.RunPython(backfill_members, migrations.RunPython.noop),
+    ]
@@ -12,6 +12,9 @@ class Conversation(models.Model):
     participants = models.ManyToManyField(User, related_name="conversations")
     admin = models.ManyToManyField(User, related_name="conversation_admin")
     is_group = models.BooleanField(default=False)
+    dm_key = models.CharField(
+        max_length=64, null=True, blank=True, unique=True, editable=False
+    )
     group_name = models.CharField(max_length=100, null=True, blank=True, unique=True)
     group_image = models.ImageField(upload_to="group_images/", null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -84,3 +87,33 @@ class UserStatus(models.Model):
 
     def __str__(self):
         return f"{self.user.username}'s status for conversation {self.conversation.id}"
+
+
+class ConversationMember(models.Model):
+    ROLE_CHOICES = (("member", "Member"), ("admin", "Admin"))
+
+    conversation = models.ForeignKey(
+        Conversation, on_delete=models.CASCADE, related_name="members"
+    )
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="conversation_memberships"
+    )
+    role = models.CharField(max_length=10, choices=ROLE_CHOICES, default="member")
+    last_read_message = models.ForeignKey(
+        Message, null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    unread_count = models.PositiveIntegerField(default=0)
+    muted = models.BooleanField(default=False)
+    blocked = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["conversation", "user"], name="unique_conversation_member"
+            )
+        ]
+        indexes = [models.Index(fields=["user", "-last_message_at"])]
+
+    def __str__(self):
+        return f"{self.user} in {self.conversation}"
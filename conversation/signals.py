@@ -0,0 +1,100 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from core.context_cache import bump_context
+from .models import Conversation, ConversationMember, Message, UserStatus
+from .utils import add_members, count_new_message, uncount_message
+
+
+def participant_ids(conversation_id):
+    return list(
+        Conversation.participants.through.objects.filter(
+            conversation_id=conversation_id
+        ).values_list("user_id", flat=True)
+    )
+
+
+def bump_participants(user_ids):
+    bump_context("conversations", *user_ids)
+    bump_context("profile", *user_ids)
+
+
+def changed_pairs(instance, reverse, pk_set):
+    if reverse:
+        return {(conversation_id, instance.pk) for conversation_id in pk_set}
+    return {(instance.pk, user_id) for user_id in pk_set}
+
+
+def changed_members(instance, reverse, pk_set):
+    if reverse:
+        members = ConversationMember.objects.filter(user=instance.pk)
+        if pk_set is not None:
+            members = members.filter(conversation__in=pk_set)
+        return members
+    members = ConversationMember.objects.filter(conversation=instance.pk)
+    if pk_set is not None:
+        members = members.filter(user__in=pk_set)
+    return members
+
+
+@receiver(post_save, sender=Message)
+def message_saved(sender, instance, created, **kwargs):
+    if created:
+        count_new_message(instance)
+    bump_context("conversations", *participant_ids(instance.conversation_id))
+
+
+def deleting_conversation(kwargs):
+    return isinstance(kwargs.get("origin"), Conversation)
+
+
+@receiver(pre_delete, sender=Message)
+def message_deleting(sender, instance, **kwargs):
+    if not deleting_conversation(kwargs):
+        uncount_message(instance)
+
+
+@receiver(post_delete, sender=Message)
+def message_deleted(sender, instance, **kwargs):
+    if deleting_conversation(kwargs):
+        return
+    bump_context("conversations", *participant_ids(instance.conversation_id))
+
+
+@receiver(post_save, sender=Conversation)
+@receiver(pre_delete, sender=Conversation)
+def conversation_changed(sender, instance, **kwargs):
+    bump_participants(participant_ids(instance.pk))
+
+
+@receiver(m2m_changed, sender=Conversation.participants.through)
+def participants_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("pre_clear", "post_add", "post_remove"):
+        return
+
+    if action == "post_add":
+        add_members(changed_pairs(instance, reverse, pk_set))
+    else:
+        changed_members(instance, reverse, pk_set).delete()
+
+    if reverse:
+        bump_participants([instance.pk])
+    else:
+        bump_participants([*(pk_set or ()), *participant_ids(instance.pk)])
+
+
+@receiver(m2m_changed, sender=Conversation.admin.through)
+def admins_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ("post_add", "post_remove", "pre_clear"):
+        changed_members(instance, reverse, pk_set).update(
+            role="admin" if action == "post_add" else "member"
+        )
+
+
+@receiver(post_save, sender=UserStatus)
+@receiver(post_delete, sender=UserStatus)
+def status_changed(sender, instance, signal, **kwargs):
+    blocked = signal is post_save and instance.status == "Block"
+    ConversationMember.objects.filter(
+        conversation=instance.conversation_id, user=instance.user_id
+    ).update(blocked=blocked)
+    bump_context("conversations", instance.user_id)
@@ -1,10 +1,112 @@
+import hashlib
 import logging
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
+from django.db import transaction
+from django.db.models import Case, F, Max, Subquery, When
+from django.db.models.functions import Greatest
+from core.context_cache import bump_context
+from .models import Conversation, ConversationMember, Message, UserStatus
 
 logger = logging.getLogger(__name__)
 
 
+def dm_key(user_id, other_id):
+    pair = ":".join(sorted((str(user_id), str(other_id))))
+    return hashlib.sha256(pair.encode()).hexdigest()
+
+
+def direct_conversation(user, other):
+    with transaction.atomic():
+        conversation, created = Conversation.objects.get_or_create(
+            dm_key=dm_key(user.pk, other.pk)
+        )
+        if created:
+            conversation.participants.add(user, other)
+    return conversation, created
+
+
+def add_members(pairs):
+    pairs = set(pairs)
+    conversation_ids = {conversation_id for conversation_id, user_id in pairs}
+    admins = set(
+        Conversation.admin.through.objects.filter(
+            conversation_id__in=conversation_ids
+        ).values_list("conversation_id", "user_id")
+    )
+    blocked = set(
+        UserStatus.objects.filter(
+            conversation_id__in=conversation_ids, status="Block"
+        ).values_list("conversation_id", "user_id")
+    )
+    last_message_at = dict(
+        Message.objects.filter(conversation_id__in=conversation_ids)
+        .order_by()
+        .values_list("conversation_id")
+        .annotate(latest=Max("timestamp"))
+    )
+    ConversationMember.objects.bulk_create(
+        [
+            ConversationMember(
+                conversation_id=conversation_id,
+                user_id=user_id,
+                role="admin" if (conversation_id, user_id) in admins else "member",
+                last_message_at=last_message_at.get(conversation_id),
+                blocked=(conversation_id, user_id) in blocked,
+            )
+            for conversation_id, user_id in pairs
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def count_new_message(message):
+    ConversationMember.objects.filter(conversation_id=message.conversation_id).update(
+        last_message_at=message.timestamp,
+        unread_count=Case(
+            When(user=message.sender_id, then=F("unread_count")),
+            default=F("unread_count") + 1,
+        ),
+    )
+
+
+def uncount_message(message):
+    members = ConversationMember.objects.filter(
+        conversation_id=message.conversation_id, unread_count__gt=0
+    ).exclude(user=message.sender_id)
+    if message.conversation.is_group:
+        members = members.exclude(user__in=message.read_by.all())
+    elif message.read:
+        return
+    members.update(unread_count=Greatest(F("unread_count") - 1, 0))
+
+
+def mark_conversation_read(conversation, user):
+    unread = Message.objects.filter(conversation=conversation).exclude(sender=user)
+    if conversation.is_group:
+        Message.read_by.through.objects.bulk_create(
+            [
+                Message.read_by.through(message_id=message_id, user_id=user.id)
+                for message_id in unread.exclude(read_by=user).values_list(
+                    "id", flat=True
+                )
+            ],
+            ignore_conflicts=True,
+        )
+    else:
+        unread.filter(read=False).update(read=True)
+
+    ConversationMember.objects.filter(conversation=conversation, user=user).update(
+        unread_count=0,
+        last_read_message=Subquery(
+            Message.objects.filter(conversation=conversation)
+            .order_by("-timestamp")
+            .values("id")[:1]
+        ),
+    )
+    bump_context("conversations", user.pk)
+
+
 def message_handler(message):
     try:
         channel_layer = get_channel_layer()
@@ -1,6 +1,6 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q, Prefetch, Count, Max, Case, When
+from django.db.models import F, Q, Prefetch
 from django.contrib import messages
 from datetime import datetime
 
@@ -8,7 +8,7 @@ from django.contrib.auth import get_user_model
 from conversation.forms import CreateForm
 from accounts.models import Follow
 from conversation.models import *
-from conversation.utils import message_handler
+from conversation.utils import mark_conversation_read, message_handler
 from core.utils import *
 
 
@@ -116,42 +116,15 @@ def delete_group(request, pk):
 
 @login_required
 def conversations(request):
-    messages_filter = Message.objects.filter(conversation__participants=request.user)
-
     Convs = (
-        Conversation.objects.prefetch_related(
-            Prefetch("messages", queryset=messages_filter, to_attr="messages_filter")
+        Conversation.objects.filter(
+            members__user=request.user, members__blocked=False
         )
-        .filter(participants=request.user)
         .annotate(
-            latest_message=Max("messages__timestamp"),
-            unread_count=Case(
-                When(
-                    is_group=False,
-                    then=Count(
-                        "messages",
-                        filter=Q(messages__read=False)
-                        & ~Q(messages__sender=request.user),
-                        distinct=True,
-                    ),
-                ),
-                When(
-                    is_group=True,
-                    then=Count(
-                        "messages",
-                        filter=~Q(messages__sender=request.user)
-                        & ~Q(messages__read_by=request.user),
-                        distinct=True,
-                    ),
-                ),
-            ),
-        )
-        .exclude(
-            conversation_status__user=request.user,
-            conversation_status__status="Block",
+            latest_message=F("members__last_message_at"),
+            unread_count=F("members__unread_count"),
         )
-        .order_by("-latest_message")
-        .distinct()
+        .order_by(F("latest_message").desc(nulls_last=True))
     )
 
     if request.method == "POST":
@@ -199,20 +172,7 @@ def chat_room(request, pk):
 
     other_user = chat.other_participants(request.user)
 
-    if chat.is_group:
-        unread_group_messages = Message.objects.filter(conversation=chat).exclude(
-            sender=request.user
-        )
-
-        for message in unread_group_messages:
-            message.mark_as_read_by_user(request.user)
-
-    else:
-        Message.objects.filter(
-            conversation=chat,
-            read=False,
-            sender=other_user,
-        ).update(read=True)
+    mark_conversation_read(chat, request.user)
 
     mutual_follow_exists = Follow.objects.filter(
         Q(follower=request.user, following=other_user)
@@ -0,0 +1,61 @@
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+
+
+def version_key(section, user_id):
+    return f"context:{section}:version:{user_id}"
+
+
+def bump_context(section, *user_ids):
+    cache.set_many(
+        {version_key(section, user_id): uuid.uuid4().hex for user_id in user_ids},
+        None,
+    )
+
+
+def context_version(section, user_id):
+    key = version_key(section, user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def context_versions(section, user_ids):
+    keys = [version_key(section, user_id) for user_id in user_ids]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid.uuid4().hex, None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+class ContextSection:
+    def __init__(self, section, user, compute):
+        self.section = section
+        self.user = user
+        self.compute = compute
+        self.values = None
+
+    def cache_key(self):
+        version = context_version(self.section, self.user.pk)
+        return f"context:{self.section}:{self.user.pk}:{version}"
+
+    def load(self):
+        if self.values is None:
+            key = self.cache_key()
+            self.values = cache.get(key)
+            if self.values is None:
+                self.values = self.compute(self.user)
+                cache.set(key, self.values, settings.CONTEXT_CACHE_TIMEOUT)
+        return self.values
+
+    def lazy(self, *names):
+        return {
+            name: SimpleLazyObject(lambda name=name: self.load()[name])
+            for name in names
+        }
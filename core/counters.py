@@ -0,0 +1,280 @@
+import random
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Greatest, Log
+from django.utils import timezone
+from core.feed import refresh_rank_scores
+from core.models import Comment, CounterFlush, CounterShard, Like, Post
+from core.utils import get_redis
+
+LIKE_DELTAS_KEY = "counters:like_deltas"
+FLUSHING_LIKE_DELTAS_KEY = "counters:like_deltas:flushing"
+FLUSH_ID_KEY = "counters:like_deltas:flush_id"
+FLUSH_LOCK_KEY = "counters:like_deltas:lock"
+
+
+def counted_models():
+    return {
+        ContentType.objects.get_for_model(model).id: model for model in (Post, Comment)
+    }
+
+
+def log_engagement(like_count):
+    engagement = like_count + settings.FEED_RANK_COMMENT_WEIGHT * F("comment_count")
+    return Log(10, Greatest(engagement, 1))
+
+
+def update_like_counts(model, deltas):
+    with transaction.atomic():
+        for object_id, delta in deltas.items():
+            if not delta:
+                continue
+            like_count = Greatest(F("like_count") + delta, 0)
+            fields = {"like_count": like_count}
+            if model is Post:
+                fields["rank_score"] = (
+                    F("rank_score")
+                    + log_engagement(like_count)
+                    - log_engagement(F("like_count"))
+                )
+            model.objects.filter(id=object_id).update(**fields)
+
+
+def apply_like_delta(content_type_id, object_id, delta):
+    model = counted_models().get(content_type_id)
+    if model is None:
+        return
+
+    redis = get_redis()
+    if redis is None:
+        update_like_counts(model, {object_id: delta})
+    elif settings.LIKE_COUNTER_BUFFERED:
+        redis.hincrby(LIKE_DELTAS_KEY, f"{content_type_id}:{object_id}", delta)
+    elif is_hot(redis, content_type_id, object_id):
+        increment_shard(content_type_id, object_id, delta)
+    else:
+        update_like_counts(model, {object_id: delta})
+
+
+def drop_counter_shards(model, object_ids):
+    CounterShard.objects.filter(
+        content_type=ContentType.objects.get_for_model(model),
+        object_id__in=object_ids,
+    ).delete()
+
+
+def is_hot(redis, content_type_id, object_id):
+    minute = timezone.now().strftime("%Y%m%d%H%M")
+    key = f"counters:like_rate:{content_type_id}:{object_id}:{minute}"
+    count, _ = redis.pipeline().incr(key).expire(key, 120).execute()
+    return count > settings.LIKE_SHARD_THRESHOLD
+
+
+def increment_shard(content_type_id, object_id, delta):
+    fields = {
+        "content_type_id": content_type_id,
+        "object_id": object_id,
+        "shard": random.randrange(settings.LIKE_COUNTER_SHARDS),
+    }
+    while not CounterShard.objects.filter(**fields).update(count=F("count") + delta):
+        CounterShard.objects.get_or_create(**fields)
+
+
+def flush_like_deltas():
+    redis = get_redis()
+    if redis is None:
+        return 0
+
+    lock = redis.lock(FLUSH_LOCK_KEY, timeout=settings.LIKE_FLUSH_LOCK_TIMEOUT)
+    if not lock.acquire(blocking=False):
+        return 0
+    try:
+        return apply_like_deltas(redis)
+    finally:
+        if lock.owned():
+            lock.release()
+
+
+def apply_like_deltas(redis):
+    if not redis.exists(FLUSHING_LIKE_DELTAS_KEY):
+        if not redis.exists(LIKE_DELTAS_KEY):
+            return 0
+        redis.delete(FLUSH_ID_KEY)
+        redis.rename(LIKE_DELTAS_KEY, FLUSHING_LIKE_DELTAS_KEY)
+    redis.set(FLUSH_ID_KEY, uuid.uuid4().hex, nx=True)
+    flush_id = redis.get(FLUSH_ID_KEY).decode()
+
+    models = counted_models()
+    deltas = defaultdict(dict)
+    for field, delta in redis.hgetall(FLUSHING_LIKE_DELTAS_KEY).items():
+        content_type_id, object_id = field.decode().split(":", 1)
+        model = models.get(int(content_type_id))
+        if model is not None:
+            deltas[model][object_id] = int(delta)
+
+    applied = 0
+    with transaction.atomic():
+        _, created = CounterFlush.objects.get_or_create(flush_id=flush_id)
+        if created:
+            for model, model_deltas in deltas.items():
+                update_like_counts(model, model_deltas)
+            applied = sum(len(model_deltas) for model_deltas in deltas.values())
+        CounterFlush.objects.filter(
+            created_at__lt=timezone.now() - timedelta(days=1)
+        ).delete()
+
+    redis.delete(FLUSHING_LIKE_DELTAS_KEY, FLUSH_ID_KEY)
+    return applied
+
+
+def reconcile_counts(model, field, totals, fix=True):
+    drifted = []
+    for obj in model.objects.only("id", field).iterator(chunk_size=2000):
+        expected = totals.get(obj.id, 0)
+        if getattr(obj, field) != expected:
+            setattr(obj, field, expected)
+            drifted.append(obj)
+
+    if not fix:
+        return len(drifted)
+
+    model.objects.bulk_update(drifted, [field], batch_size=500)
+    if model is Post and drifted:
+        refresh_rank_scores(Post.objects.filter(id__in=[obj.id for obj in drifted]))
+    return len(drifted)
+
+
+def drop_buffered_likes(redis, content_type_id):
+    for key in (LIKE_DELTAS_KEY, FLUSHING_LIKE_DELTAS_KEY):
+        fields = [
+            field
+            for field, _ in redis.hscan_iter(key, match=f"{content_type_id}:*")
+        ]
+        if fields:
+            redis.hdel(key, *fields)
+
+
+def reconcile_pending_likes(redis, model):
+    content_type = ContentType.objects.get_for_model(model)
+    with transaction.atomic():
+        totals = dict(
+            Like.objects.filter(content_type=content_type)
+            .values_list("object_id")
+            .annotate(total=Count("id"))
+        )
+        CounterShard.objects.filter(content_type=content_type).delete()
+        if redis is not None:
+            transaction.on_commit(lambda: drop_buffered_likes(redis, content_type.id))
+        return reconcile_counts(model, "like_count", totals)
+
+
+def reconcile_like_counts(model):
+    redis = get_redis()
+    if redis is None:
+        return reconcile_pending_likes(None, model)
+
+    with redis.lock(FLUSH_LOCK_KEY, timeout=settings.LIKE_FLUSH_LOCK_TIMEOUT):
+        return reconcile_pending_likes(redis, model)
+
+
+def reconcile_comment_counts():
+    def totals(field):
+        return dict(
+            Comment.objects.exclude(**{field: None})
+            .order_by()
+            .values_list(field)
+            .annotate(total=Count("id"))
+        )
+
+    return (
+        reconcile_counts(Post, "comment_count", totals("post")),
+        reconcile_counts(Comment, "reply_count", totals("parent")),
+    )
+
+
+def pending_shard_likes(model, object_ids):
+    return dict(
+        CounterShard.objects.filter(
+            content_type=ContentType.objects.get_for_model(model),
+            object_id__in=object_ids,
+        )
+        .values_list("object_id")
+        .annotate(total=Sum("count"))
+    )
+
+
+def with_live_like_counts(objects):
+    objects = list(objects)
+
+    object_ids = defaultdict(set)
+    for obj in objects:
+        object_ids[type(obj)].add(obj.id)
+
+    pending = {
+        model: pending_shard_likes(model, ids) for model, ids in object_ids.items()
+    }
+    for obj in objects:
+        delta = pending[type(obj)].get(obj.id, 0)
+        obj.like_count = max(obj.like_count + delta, 0)
+    return objects
+
+
+def with_viewer_likes(user, objects):
+    objects = list(objects)
+
+    object_ids = defaultdict(set)
+    for obj in objects:
+        object_ids[type(obj)].add(obj.id)
+
+    liked = set()
+    for model, ids in object_ids.items():
+        liked.update(
+            (model, object_id)
+            for object_id in Like.objects.filter(
+                user=user,
+                content_type=ContentType.objects.get_for_model(model),
+                object_id__in=ids,
+            ).values_list("object_id", flat=True)
+        )
+
+    for obj in objects:
+        obj.viewer_has_liked = (type(obj), obj.id) in liked
+    return objects
+
+
+def page_comments(posts):
+    return [
+        comment for post in posts for comment in getattr(post, "none_parent_comment", [])
+    ]
+
+
+def collapse_counter_shards():
+    shards = list(
+        CounterShard.objects.values_list("id", "content_type_id", "object_id", "count")
+    )
+
+    models = counted_models()
+    deltas = defaultdict(lambda: defaultdict(int))
+    for shard_id, content_type_id, object_id, count in shards:
+        model = models.get(content_type_id)
+        if model is not None:
+            deltas[model][object_id] += count
+
+    with transaction.atomic():
+        for shard_id, content_type_id, object_id, count in shards:
+            if count:
+                CounterShard.objects.filter(id=shard_id).update(
+                    count=F("count") - count
+                )
+        for model, model_deltas in deltas.items():
+            update_like_counts(model, model_deltas)
+        CounterShard.objects.filter(
+            id__in=[shard_id for shard_id, *_ in shards], count=0
+        ).delete()
+
+    return len(shards)
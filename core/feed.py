@@ -0,0 +1,380 @@
+import heapq
+import uuid
+from datetime import datetime
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Q, Prefetch, Window
+from django.db.models.functions import RowNumber
+from accounts.models import Follow
+from core.models import Comment, Post, TimelineEntry
+from core.utils import encode_cursor, decode_cursor, rank_score
+
+User = get_user_model()
+
+PULL_AUTHORS_KEY = "feed:pull_authors"
+SYNCED_PULL_AUTHORS_KEY = "feed:pull_authors:synced"
+
+
+def recent_posts_key(author_id):
+    return f"feed:recent:{author_id}"
+
+
+def timeline_built_key(user_id):
+    return f"feed:built:{user_id}"
+
+
+def timeline_entries(user_ids, posts):
+    return [
+        TimelineEntry(
+            user_id=user_id,
+            post_id=post_id,
+            author_id=author_id,
+            created_at=created_at,
+        )
+        for user_id in user_ids
+        for post_id, author_id, created_at in posts
+    ]
+
+
+def pull_authors():
+    authors = cache.get(PULL_AUTHORS_KEY)
+    if authors is None:
+        popular = User.objects.filter(
+            followers_count__gte=settings.FEED_PULL_FOLLOWER_THRESHOLD
+        ).values_list("id", flat=True)
+        authors = dict.fromkeys(popular, False)
+        authors.update(
+            dict.fromkeys(
+                User.objects.filter(verified=True).values_list("id", flat=True), True
+            )
+        )
+        cache.set(PULL_AUTHORS_KEY, authors, settings.FEED_PULL_AUTHORS_TIMEOUT)
+    return authors
+
+
+def sync_pull_authors():
+    authors = list(pull_authors())
+    previous = cache.get(SYNCED_PULL_AUTHORS_KEY)
+    cache.set(SYNCED_PULL_AUTHORS_KEY, authors, None)
+    if previous is None:
+        return 0
+
+    left = set(previous) - set(authors)
+    for author_id in left:
+        backfill_followers(author_id)
+    return len(left)
+
+
+def backfill_followers(author_id):
+    posts = list(
+        Post.objects.filter(user=author_id)
+        .order_by("-created_at")
+        .values_list("id", "user_id", "created_at")[: settings.FEED_RECENT_POSTS_SIZE]
+    )
+    if posts:
+        fan_out_followers(author_id, posts)
+
+
+def fan_out_followers(author_id, posts, batch_size=100):
+    followers = Follow.objects.filter(
+        following=author_id, status=Follow.Status.ACCEPTED
+    ).values_list("follower_id", flat=True)
+    batch = []
+    for follower_id in followers.iterator(chunk_size=batch_size):
+        batch.append(follower_id)
+        if len(batch) == batch_size:
+            TimelineEntry.objects.bulk_create(
+                timeline_entries(batch, posts), ignore_conflicts=True, batch_size=1000
+            )
+            batch = []
+    TimelineEntry.objects.bulk_create(
+        timeline_entries(batch, posts), ignore_conflicts=True, batch_size=1000
+    )
+
+
+def is_pull_author(user):
+    return user.verified or user.id in pull_authors()
+
+
+def fan_out_post(post):
+    if is_pull_author(post.user):
+        cache.delete(recent_posts_key(post.user_id))
+
+    TimelineEntry.objects.bulk_create(
+        timeline_entries([post.user_id], [(post.id, post.user_id, post.created_at)]),
+        ignore_conflicts=True,
+    )
+
+
+def fan_out_post_followers(post_id):
+    post = Post.objects.select_related("user").filter(id=post_id).first()
+    if post is None or is_pull_author(post.user):
+        return
+    fan_out_followers(post.user_id, [(post.id, post.user_id, post.created_at)])
+
+
+def backfill_author(user_id, author_id):
+    if author_id in pull_authors():
+        return
+
+    posts = (
+        Post.objects.filter(user=author_id)
+        .order_by("-created_at")
+        .values_list("id", "user_id", "created_at")[: settings.FEED_TIMELINE_SIZE]
+    )
+
+    TimelineEntry.objects.bulk_create(
+        timeline_entries([user_id], posts), ignore_conflicts=True, batch_size=1000
+    )
+
+
+def remove_author(user_id, author_id):
+    TimelineEntry.objects.filter(user=user_id, author=author_id).delete()
+
+
+def rebuild_timeline(user):
+    following = Follow.objects.filter(
+        follower=user, status=Follow.Status.ACCEPTED
+    ).values_list("following", flat=True)
+
+    posts = (
+        Post.objects.filter(Q(user__in=following) | Q(user=user))
+        .exclude(Q(user__in=list(pull_authors())) & ~Q(user=user))
+        .order_by("-created_at")
+        .values_list("id", "user_id", "created_at")[: settings.FEED_TIMELINE_SIZE]
+    )
+
+    with transaction.atomic():
+        TimelineEntry.objects.filter(user=user).delete()
+        TimelineEntry.objects.bulk_create(
+            timeline_entries([user.id], posts), batch_size=1000
+        )
+    cache.set(timeline_built_key(user.id), True, None)
+
+
+def trim_timelines():
+    overfull = (
+        TimelineEntry.objects.values("user")
+        .annotate(entries=Count("id"))
+        .filter(entries__gt=settings.FEED_TIMELINE_SIZE)
+        .values_list("user", flat=True)
+    )
+
+    trimmed = 0
+    for user_id in overfull.iterator():
+        entries = TimelineEntry.objects.filter(user=user_id)
+        created_at, entry_id = entries.order_by("-created_at", "-id").values_list(
+            "created_at", "id"
+        )[settings.FEED_TIMELINE_SIZE - 1]
+        deleted, _ = entries.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=entry_id)
+        ).delete()
+        trimmed += deleted
+    return trimmed
+
+
+def recent_posts(author_ids):
+    keys = {recent_posts_key(author_id): author_id for author_id in author_ids}
+    cached = cache.get_many(keys)
+
+    missing = [author_id for key, author_id in keys.items() if key not in cached]
+    if missing:
+        rows = (
+            Post.objects.filter(user__in=missing)
+            .annotate(
+                position=Window(
+                    RowNumber(),
+                    partition_by=F("user"),
+                    order_by=F("created_at").desc(),
+                )
+            )
+            .filter(position__lte=settings.FEED_RECENT_POSTS_SIZE)
+            .order_by("user", "-created_at", "-id")
+            .values_list("user_id", "created_at", "id")
+        )
+
+        fetched = {recent_posts_key(author_id): [] for author_id in missing}
+        for author_id, created_at, post_id in rows:
+            fetched[recent_posts_key(author_id)].append((created_at, post_id))
+        cache.set_many(fetched, settings.FEED_PULL_AUTHORS_TIMEOUT)
+        cached.update(fetched)
+
+    return list(cached.values())
+
+
+def older_than(before, post_id="post_id"):
+    if before is None:
+        return Q()
+    created_at, before_id = before
+    return Q(created_at__lt=created_at) | Q(
+        created_at=created_at, **{f"{post_id}__lt": before_id}
+    )
+
+
+def post_history(author_ids, before):
+    return list(
+        Post.objects.filter(user__in=author_ids)
+        .filter(older_than(before, "id"))
+        .order_by("-created_at", "-id")
+        .values_list("created_at", "id")[: settings.FEED_TIMELINE_SIZE]
+    )
+
+
+def timeline_window(user, before=None):
+    entries = (
+        TimelineEntry.objects.filter(user=user)
+        .filter(older_than(before))
+        .order_by("-created_at", "-post_id")
+        .values_list("created_at", "post_id")[: settings.FEED_TIMELINE_SIZE]
+    )
+
+    if (
+        before is None
+        and not entries.exists()
+        and not cache.get(timeline_built_key(user.id))
+    ):
+        rebuild_timeline(user)
+
+    following = set(
+        Follow.objects.filter(
+            follower=user, status=Follow.Status.ACCEPTED
+        ).values_list("following", flat=True)
+    )
+    pulled = [
+        author_id
+        for author_id, verified in pull_authors().items()
+        if verified or author_id in following
+    ]
+
+    entries = list(entries)
+    floor = None
+    if before is None:
+        recent = recent_posts(pulled)
+        streams = [entries] + recent
+        truncated = [
+            stream[-1]
+            for stream in recent
+            if len(stream) == settings.FEED_RECENT_POSTS_SIZE
+        ]
+        if truncated:
+            floor = max(truncated)
+    else:
+        streams = [entries, post_history(pulled, before)]
+    if len(entries) < settings.FEED_TIMELINE_SIZE:
+        oldest = entries[-1] if entries else before
+        streams.append(post_history({*following, user.id, *pulled}, oldest))
+
+    window = []
+    seen = set()
+    for created_at, post_id in heapq.merge(*streams, reverse=True):
+        if floor is not None and (created_at, post_id) < floor:
+            break
+        if post_id not in seen:
+            seen.add(post_id)
+            window.append((created_at, post_id))
+            if len(window) == settings.FEED_TIMELINE_SIZE:
+                break
+
+    return window
+
+
+def timeline_post_ids(user, before=None):
+    return [post_id for created_at, post_id in timeline_window(user, before)]
+
+
+def feed_window(user, before=None, refresh=False):
+    key = f"feed:window:{user.id}:head"
+    if before is not None:
+        key = f"feed:window:{user.id}:{before[0].isoformat()}:{before[1]}"
+
+    window = None if refresh else cache.get(key)
+    if window is None:
+        window = timeline_window(user, before)
+        cache.set(key, window, settings.FEED_WINDOW_TIMEOUT)
+    return window
+
+
+def feed_page(user, cursor=None):
+    posts = (
+        Post.objects.select_related("user")
+        .prefetch_related(
+            "media",
+            Prefetch(
+                "comments",
+                queryset=Comment.objects.filter(parent=None).select_related("user"),
+                to_attr="none_parent_comment",
+            ),
+        )
+        .order_by("-rank_score", "-created_at", "-id")
+    )
+
+    before = after = None
+    if cursor:
+        window_created_at, window_post_id, score, created_at, post_id = (
+            decode_cursor(cursor)
+        )
+        if window_created_at:
+            before = (
+                datetime.fromisoformat(window_created_at),
+                uuid.UUID(window_post_id),
+            )
+        if score:
+            after = (
+                float(score),
+                datetime.fromisoformat(created_at),
+                uuid.UUID(post_id),
+            )
+
+    page = []
+    while True:
+        window = feed_window(user, before, refresh=cursor is None and before is None)
+        window_posts = posts.filter(id__in=[post_id for _, post_id in window])
+        if after is not None:
+            score, created_at, post_id = after
+            window_posts = window_posts.filter(
+                Q(rank_score__lt=score)
+                | Q(rank_score=score, created_at__lt=created_at)
+                | Q(rank_score=score, created_at=created_at, id__lt=post_id)
+            )
+        page += window_posts[: settings.FEED_PAGE_SIZE + 1 - len(page)]
+
+        if len(page) > settings.FEED_PAGE_SIZE:
+            break
+        if not window:
+            return page, None
+        before, after = window[-1], None
+
+    page = page[: settings.FEED_PAGE_SIZE]
+    last = page[-1]
+    next_cursor = encode_cursor(
+        before[0].isoformat() if before else "",
+        before[1] if before else "",
+        repr(last.rank_score),
+        last.created_at.isoformat(),
+        last.id,
+    )
+    return page, next_cursor
+
+
+def refresh_rank_scores(posts, batch_size=500):
+    refreshed = 0
+    batch = []
+    posts = posts.only("id", "like_count", "comment_count", "created_at")
+    for post in posts.iterator(chunk_size=batch_size):
+        post.rank_score = rank_score(
+            post.like_count, post.comment_count, post.created_at
+        )
+        batch.append(post)
+        if len(batch) == batch_size:
+            Post.objects.bulk_update(batch, ["rank_score"])
+            refreshed += len(batch)
+            batch = []
+
+    Post.objects.bulk_update(batch, ["rank_score"])
+    return refreshed + len(batch)
+
+
+def update_rank_score(post_id):
+    refresh_rank_scores(Post.objects.filter(id=post_id))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from core.counters import reconcile_comment_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute comment_count of every Post and reply_count of every Comment"
+
+    def handle(self, *args, **options):
+        posts, comments = reconcile_comment_counts()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Fixed {posts} post comment counts and {comments} reply counts"
+            )
+        )
@@ -0,0 +1,65 @@
+from time import perf_counter
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from accounts.models import Follow
+from core.feed import timeline_post_ids
+from core.models import Post
+
+User = get_user_model()
+
+
+def legacy_post_ids(user):
+    following = Follow.objects.filter(
+        follower=user, status=Follow.Status.ACCEPTED
+    ).values_list("following", flat=True)
+
+    return list(
+        Post.objects.filter(
+            Q(user__in=following) | Q(user__verified=True) | Q(user=user)
+        )
+        .order_by("-like_count", "-created_at")
+        .values_list("id", flat=True)
+    )
+
+
+def timed(func, user, rounds):
+    started = perf_counter()
+    for _ in range(rounds):
+        result = func(user)
+    return (perf_counter() - started) * 1000 / rounds, len(result)
+
+
+class Command(BaseCommand):
+    help = "Compare the legacy home feed query with the hybrid push/pull timeline"
+
+    def add_arguments(self, parser):
+        parser.add_argument("usernames", nargs="*")
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--rounds", type=int, default=5)
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options["usernames"]:
+            users = users.filter(username__in=options["usernames"])
+        users = users.order_by("-date_joined")[: options["users"]]
+
+        legacy_total = hybrid_total = 0
+        for user in users:
+            timeline_post_ids(user)
+
+            legacy_ms, legacy_posts = timed(legacy_post_ids, user, options["rounds"])
+            hybrid_ms, hybrid_posts = timed(timeline_post_ids, user, options["rounds"])
+            legacy_total += legacy_ms
+            hybrid_total += hybrid_ms
+
+            self.stdout.write(
+                f"{user.username}: legacy {legacy_ms:.2f}ms ({legacy_posts} posts), "
+                f"hybrid {hybrid_ms:.2f}ms ({hybrid_posts} posts)"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Total: legacy {legacy_total:.2f}ms, hybrid {hybrid_total:.2f}ms"
+            )
+        )
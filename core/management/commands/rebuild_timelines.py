@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from core.feed import rebuild_timeline
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Rebuild the materialized home timeline of every user, or of the given usernames"
+
+    def add_arguments(self, parser):
+        parser.add_argument("usernames", nargs="*")
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options["usernames"]:
+            users = users.filter(username__in=options["usernames"])
+
+        rebuilt = 0
+        for user in users.iterator():
+            rebuild_timeline(user)
+            rebuilt += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} timelines"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from core.counters import reconcile_like_counts
+from core.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = "Recompute like_count of every Post and Comment from the Like table"
+
+    def handle(self, *args, **options):
+        for model in (Post, Comment):
+            fixed = reconcile_like_counts(model)
+            self.stdout.write(
+                self.style.SUCCESS(f"{model.__name__}: fixed {fixed} like counts")
+            )
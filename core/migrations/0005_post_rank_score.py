@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:16
+
+import math
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def rank_score(like_count, comment_count, created_at):
+    comment_weight = getattr(settings, "FEED_RANK_COMMENT_WEIGHT", 2.0)
+    decay = getattr(settings, "FEED_RANK_DECAY", 45000)
+    engagement = like_count + comment_weight * comment_count
+    return math.log10(max(engagement, 1)) + created_at.timestamp() / decay
+
+
+def backfill_rank_scores(apps, schema_editor):
+    Post = apps.get_model("core", "Post")
+    posts = Post.objects.annotate(total_comments=Count("comments")).only(
+        "id", "like_count", "created_at"
+    )
+    batch = []
+    for post in posts.iterator(chunk_size=500):
+        post.rank_score = rank_score(
+            post.like_count, post.total_comments, post.created_at
+        )
+        batch.append(post)
+        if len(batch) == 500:
+            Post.objects.bulk_update(batch, ["rank_score"])
+            batch = []
+    Post.objects.bulk_update(batch, ["rank_score"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_timelineentry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='rank_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-rank_score', '-created_at', '-id'], name='core_post_rank_sc_24edb6_idx'),
+        ),
+        migrations.RunPython(backfill_rank_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('core', '0005_post_rank_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CounterShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.CharField(max_length=100)),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('content_type', 'object_id', 'shard'), name='unique_counter_shard')],
+            },
+        ),
+    ]
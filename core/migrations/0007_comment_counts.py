@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:20
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_comment_counts(apps, schema_editor):
+    Post = apps.get_model("core", "Post")
+    Comment = apps.get_model("core", "Comment")
+
+    def total(**filters):
+        return Coalesce(
+            Subquery(
+                Comment.objects.filter(**filters)
+                .order_by()
+                .values(*filters)
+                .annotate(total=Count("id"))
+                .values("total")
+            ),
+            0,
+        )
+
+    Post.objects.update(comment_count=total(post=OuterRef("pk")))
+    Comment.objects.update(reply_count=total(parent=OuterRef("pk")))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_countershard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_comment_counts, migrations.RunPython.noop),
+    ]
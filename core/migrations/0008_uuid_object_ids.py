@@ -0,0 +1,85 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:25
+
+import uuid
+from django.db import migrations, models
+
+
+def copy_object_ids(apps, schema_editor):
+    for model_name in ("Like", "CounterShard"):
+        model = apps.get_model("core", model_name)
+        invalid = []
+        batch = []
+        for obj in model.objects.only("id", "object_id").iterator(chunk_size=2000):
+            try:
+                obj.object_uuid = uuid.UUID(obj.object_id)
+            except ValueError:
+                invalid.append(obj.id)
+                continue
+            batch.append(obj)
+            if len(batch) == 500:
+                model.objects.bulk_update(batch, ["object_uuid"])
+                batch = []
+        model.objects.bulk_update(batch, ["object_uuid"])
+        model.objects.filter(id__in=invalid).delete()
+
+
+def swap_operations(model_name):
+    return [
+        migrations.RemoveField(model_name=model_name, name="object_id"),
+        migrations.RenameField(
+            model_name=model_name, old_name="object_uuid", new_name="object_id"
+        ),
+        migrations.AlterField(
+            model_name=model_name,
+            name="object_id",
+            field=models.UUIDField(),
+        ),
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_comment_counts"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(model_name="like", name="unique_like"),
+        migrations.RemoveIndex(model_name="like", name="core_like_content_c5c987_idx"),
+        migrations.RemoveConstraint(
+            model_name="countershard", name="unique_counter_shard"
+        ),
+        migrations.AddField(
+            model_name="like",
+            name="object_uuid",
+            field=models.UUIDField(null=True),
+        ),
+        migrations.AddField(
+            model_name="countershard",
+            name="object_uuid",
+            field=models.UUIDField(null=True),
+        ),
+        migrations.RunPython(copy_object_ids, migrations.RunPython.noop),
+        *swap_operations("like"),
+        *swap_operations("countershard"),
+        migrations.AddConstraint(
+            model_name="like",
+            constraint=models.UniqueConstraint(
+                fields=("user", "content_type", "object_id"), name="unique_like"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="like",
+            index=models.Index(
+                fields=["content_type", "object_id"],
+                name="core_like_content_c5c987_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="countershard",
+            constraint=models.UniqueConstraint(
+                fields=("content_type", "object_id", "shard"),
+                name="unique_counter_shard",
+            ),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:26
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def comment_path_segment(comment_id, created_at):
+    micros = int(created_at.timestamp() * 1_000_000)
+    return f"{micros:013x}{comment_id.hex[:3]}"
+
+
+def backfill_comment_paths(apps, schema_editor):
+    Comment = apps.get_model("core", "Comment")
+
+    while True:
+        rows = list(
+            Comment.objects.filter(path="")
+            .filter(Q(parent=None) | ~Q(parent__path=""))
+            .values_list("id", "created_at", "parent__path", "parent__depth")[:2000]
+        )
+        if not rows:
+            break
+
+        Comment.objects.bulk_update(
+            [
+                Comment(
+                    id=comment_id,
+                    path=(parent_path or "")
+                    + comment_path_segment(comment_id, created_at),
+                    depth=0 if parent_path is None else parent_depth + 1,
+                )
+                for comment_id, created_at, parent_path, parent_depth in rows
+            ],
+            ["path", "depth"],
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_uuid_object_ids'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(default='', editable=False, max_length=1024),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'path'], name='core_commen_post_id_3e9299_idx'),
+        ),
+        migrations.RunPython(backfill_comment_paths, migrations.RunPython.noop),
+    ]
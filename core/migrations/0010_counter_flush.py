@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_comment_path'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CounterFlush',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('flush_id', models.CharField(max_length=32, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:33
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_counter_flush'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='core_post_rank_sc_24edb6_idx',
+        ),
+    ]
@@ -1,7 +1,9 @@
 from django.conf import settings
 from django.db import models
 from django.contrib.contenttypes.models import ContentType
-from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
+from django.utils import timezone
+from core.utils import comment_path_segment, rank_score
 import uuid
 
 
@@ -12,15 +14,21 @@ class Post(models.Model):
     body = models.TextField(null=True, blank=True)
     tag = models.ManyToManyField("Tag", blank=True)
     like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    rank_score = models.FloatField(default=0)
+    likes = GenericRelation("Like", related_query_name="post")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.user.username}"
 
-    @property
-    def likes(self):
-        return Like.objects.filter(content_type=ContentType.objects.get_for_model(self))
+    def save(self, *args, **kwargs):
+        if self._state.adding and not self.rank_score:
+            self.rank_score = rank_score(
+                self.like_count, self.comment_count, timezone.now()
+            )
+        return super(Post, self).save(*args, **kwargs)
 
     class Meta:
         ordering = ("-created_at",)
@@ -39,21 +47,31 @@ class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="comments")
     comment = models.CharField(max_length=1000)
     like_count = models.PositiveIntegerField(default=0)
+    reply_count = models.PositiveIntegerField(default=0)
+    path = models.CharField(max_length=1024, default="", editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    likes = GenericRelation("Like", related_query_name="comment")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.user.username}'s comment on {self.comment}"
 
-    @property
-    def likes(self):
-        return Like.objects.filter(content_type=ContentType.objects.get_for_model(self))
+    def save(self, *args, **kwargs):
+        if self._state.adding and not self.path:
+            self.path = comment_path_segment(self.id, timezone.now())
+            self.depth = 0
+            if self.parent:
+                self.path = self.parent.path + self.path
+                self.depth = self.parent.depth + 1
+        return super(Comment, self).save(*args, **kwargs)
 
     @property
     def is_reply(self):
         return self.parent is not None
 
     class Meta:
+        indexes = [models.Index(fields=["post", "path"])]
         ordering = ("-created_at",)
 
 
@@ -62,7 +80,7 @@ class Like(models.Model):
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="likes"
     )
     content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
-    object_id = models.CharField(max_length=100)
+    object_id = models.UUIDField()
     content_object = GenericForeignKey("content_type", "object_id")
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -79,6 +97,32 @@ class Like(models.Model):
         ordering = ("-created_at",)
 
 
+class CounterShard(models.Model):
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.UUIDField()
+    shard = models.PositiveSmallIntegerField()
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.content_type} {self.object_id} shard {self.shard}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_type", "object_id", "shard"],
+                name="unique_counter_shard",
+            )
+        ]
+
+
+class CounterFlush(models.Model):
+    flush_id = models.CharField(max_length=32, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.flush_id
+
+
 class PostMedia(models.Model):
     CONTENT_TYPE = (
         ("video", "video"),
@@ -113,3 +157,28 @@ class Tag(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="timeline"
+    )
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="timeline_entries"
+    )
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+"
+    )
+    created_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.post_id} in {self.user_id}'s timeline"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "post"], name="unique_timeline_entry"
+            )
+        ]
+        indexes = [models.Index(fields=["user", "-created_at"])]
+        ordering = ("-created_at",)
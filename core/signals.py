@@ -1,25 +1,86 @@
-from django.db.models.signals import post_save, post_delete
-from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.dispatch import receiver
+from accounts.models import Follow
+from core.counters import apply_like_delta, drop_counter_shards
+from core.feed import (
+    PULL_AUTHORS_KEY,
+    fan_out_post,
+    backfill_author,
+    remove_author,
+    recent_posts_key,
+)
 from core.models import *
+from core.tasks import fan_out_post_timelines
 
+User = get_user_model()
 
-@receiver([post_save, post_delete], sender=Like)
-def increase_likes(sender, instance, **kwargs):
 
-    model_class = instance.content_object.__class__
-    content_type = ContentType.objects.get_for_model(model_class)
+@receiver(post_save, sender=Like)
+def increase_likes(sender, instance, created, **kwargs):
+    if created:
+        apply_like_delta(instance.content_type_id, instance.object_id, 1)
 
-    if model_class == Post:
-        Post.objects.filter(id=instance.object_id).update(
-            like_count=Like.objects.filter(
-                content_type=content_type, object_id=instance.object_id
-            ).count()
-        )
 
-    if model_class == Comment:
-        Comment.objects.filter(id=instance.object_id).update(
-            like_count=Like.objects.filter(
-                content_type=content_type, object_id=instance.object_id
-            ).count()
+@receiver(post_delete, sender=Like)
+def decrease_likes(sender, instance, origin=None, **kwargs):
+    if not isinstance(origin, (Post, Comment)):
+        apply_like_delta(instance.content_type_id, instance.object_id, -1)
+
+
+@receiver(pre_delete, sender=Post)
+def drop_post_shards(sender, instance, **kwargs):
+    drop_counter_shards(Post, [instance.id])
+    drop_counter_shards(Comment, instance.comments.values("id"))
+
+
+@receiver(pre_delete, sender=Comment)
+def drop_comment_shards(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Post) or (
+        isinstance(origin, Comment) and origin.pk != instance.pk
+    ):
+        return
+    drop_counter_shards(
+        Comment,
+        Comment.objects.filter(
+            post=instance.post_id, path__startswith=instance.path
+        ).values("id"),
+    )
+
+
+@receiver(post_save, sender=Post)
+def fan_out_timeline(sender, instance, created, **kwargs):
+    if created:
+        fan_out_post(instance)
+        transaction.on_commit(
+            lambda: fan_out_post_timelines.delay(str(instance.id))
         )
+
+
+@receiver(post_delete, sender=Post)
+def drop_recent_posts(sender, instance, **kwargs):
+    cache.delete(recent_posts_key(instance.user_id))
+
+
+@receiver(post_save, sender=Follow)
+def follow_timeline(sender, instance, **kwargs):
+    if instance.status == Follow.Status.ACCEPTED:
+        backfill_author(instance.follower_id, instance.following_id)
+
+
+@receiver(post_delete, sender=Follow)
+def unfollow_timeline(sender, instance, **kwargs):
+    remove_author(instance.follower_id, instance.following_id)
+
+
+@receiver(post_save, sender=User)
+def verified_author(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and "verified" not in update_fields:
+        return
+    verified = instance.__dict__.get("verified")
+    previous = getattr(instance, "_loaded_verified", False)
+    if verified is not None and verified != previous:
+        cache.delete(PULL_AUTHORS_KEY)
+        instance._loaded_verified = verified
@@ -0,0 +1,43 @@
+from datetime import timedelta
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+from core.counters import collapse_counter_shards, flush_like_deltas
+from core.feed import (
+    fan_out_post_followers,
+    refresh_rank_scores,
+    sync_pull_authors,
+    trim_timelines,
+)
+from core.models import Post
+
+
+@shared_task
+def refresh_post_rank_scores():
+    since = timezone.now() - timedelta(days=settings.FEED_RANK_REFRESH_DAYS)
+    return refresh_rank_scores(Post.objects.filter(created_at__gte=since))
+
+
+@shared_task
+def flush_like_counters():
+    return flush_like_deltas()
+
+
+@shared_task
+def collapse_like_shards():
+    return collapse_counter_shards()
+
+
+@shared_task
+def sync_feed_pull_authors():
+    return sync_pull_authors()
+
+
+@shared_task
+def trim_home_timelines():
+    return trim_timelines()
+
+
+@shared_task
+def fan_out_post_timelines(post_id):
+    fan_out_post_followers(post_id)
@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber, Substr
+from core.models import Comment
+from core.utils import COMMENT_PATH_SEGMENT, encode_cursor, decode_cursor
+
+
+def subtree(comment):
+    return Comment.objects.filter(
+        post=comment.post_id,
+        path__gt=comment.path,
+        path__lt=comment.path + "g",
+    )
+
+
+def reply_parent(parent):
+    max_depth = min(
+        settings.COMMENT_THREAD_DEPTH,
+        Comment._meta.get_field("path").max_length // COMMENT_PATH_SEGMENT - 1,
+    )
+    if parent is None or parent.depth < max_depth:
+        return parent
+    return Comment.objects.filter(
+        post=parent.post_id, path=parent.path[: max_depth * COMMENT_PATH_SEGMENT]
+    ).first()
+
+
+def with_thread_replies(comments):
+    comments = list(comments)
+    roots = {comment.path: comment for comment in comments}
+    for comment in comments:
+        comment.thread_replies = []
+        comment.replies_cursor = None
+
+    if not roots:
+        return comments
+
+    replies = (
+        Comment.objects.filter(
+            post__in={comment.post_id for comment in comments},
+            depth__gt=0,
+            depth__lte=settings.COMMENT_THREAD_DEPTH,
+        )
+        .annotate(root=Substr("path", 1, COMMENT_PATH_SEGMENT))
+        .filter(root__in=list(roots))
+        .annotate(
+            position=Window(
+                RowNumber(), partition_by=F("root"), order_by=F("path").asc()
+            )
+        )
+        .filter(position__lte=settings.COMMENT_REPLIES_PAGE_SIZE + 1)
+        .select_related("user", "parent__user")
+        .order_by("path")
+    )
+
+    for reply in replies:
+        root = roots[reply.root]
+        if len(root.thread_replies) < settings.COMMENT_REPLIES_PAGE_SIZE:
+            root.thread_replies.append(reply)
+        else:
+            root.replies_cursor = encode_cursor(root.thread_replies[-1].path)
+
+    return comments
+
+
+def replies_page(comment, cursor=None):
+    replies = (
+        subtree(comment)
+        .filter(depth__lte=settings.COMMENT_THREAD_DEPTH)
+        .select_related("user", "parent__user")
+        .order_by("path")
+    )
+
+    if cursor:
+        (path,) = decode_cursor(cursor)
+        replies = replies.filter(path__gt=path)
+
+    page = list(replies[: settings.COMMENT_REPLIES_PAGE_SIZE + 1])
+
+    next_cursor = None
+    if len(page) > settings.COMMENT_REPLIES_PAGE_SIZE:
+        page = page[: settings.COMMENT_REPLIES_PAGE_SIZE]
+        next_cursor = encode_cursor(page[-1].path)
+
+    return page, next_cursor
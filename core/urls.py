@@ -4,8 +4,14 @@ from .views import PostDetailView
 
 urlpatterns = [
     path("", views.home, name="index"),
+    path("feed/", views.feed, name="feed"),
     path("upload/", views.upload, name="upload"),
     path("search/", views.search, name="search"),
+    path(
+        "search/autocomplete/",
+        views.search_autocomplete,
+        name="search-autocomplete",
+    ),
     path("events/", views.events, name="events"),
     path("create-comment/", views.create_comment, name="create-comment"),
     path("like/<int:content_type_id>/<uuid:object_id>/", views.like, name="like"),
@@ -13,6 +19,9 @@ urlpatterns = [
     path("update/<uuid:pk>/", views.post_update, name="post-update"),
     path("delete/<uuid:id>/", views.post_delete, name="post-delete"),
     path("comment/delete/<uuid:id>/", views.delete_comment, name="comment-delete"),
+    path(
+        "comment/<uuid:id>/replies/", views.comment_replies, name="comment-replies"
+    ),
     path("comment/update/<uuid:id>/", views.comment_update, name="comment-update"),
     path("events/<str:slug>", views.profile_event, name="profile_event"),
 ]
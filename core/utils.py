@@ -1,5 +1,13 @@
+import base64
+import json
+import math
+from functools import lru_cache
+from django.conf import settings
+import redis
+
 EXTENSIONS = ["mp4", "mp3", "JPG", "jpg", "png", "PNG"]
 FILE_SIZE = 1024 * 1024 * 10
+COMMENT_PATH_SEGMENT = 16
 
 
 def validate_file_size(file):
@@ -9,3 +17,44 @@ def validate_file_size(file):
 def file_validation(file):
     file_extension = file.name.split(".")[-1] if "." in file.name else ""
     return file_extension in EXTENSIONS
+
+
+def encode_cursor(*values):
+    payload = json.dumps([str(value) for value in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or not all(
+        isinstance(value, str) for value in values
+    ):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def cursor_id(value):
+    value = int(value)
+    if not 0 < value < 2**63:
+        raise ValueError("Invalid cursor")
+    return value
+
+
+def rank_score(like_count, comment_count, created_at):
+    engagement = like_count + settings.FEED_RANK_COMMENT_WEIGHT * comment_count
+    return math.log10(max(engagement, 1)) + created_at.timestamp() / settings.FEED_RANK_DECAY
+
+
+def comment_path_segment(comment_id, created_at):
+    micros = int(created_at.timestamp() * 1_000_000)
+    return f"{micros:013x}{comment_id.hex[:3]}"
+
+
+@lru_cache(maxsize=1)
+def get_redis():
+    if not settings.REDIS_URL:
+        return None
+    return redis.Redis.from_url(settings.REDIS_URL)
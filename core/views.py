@@ -1,14 +1,27 @@
+from django.http import HttpResponseBadRequest, JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
+from django.urls import reverse
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import get_user_model
-from django.db.models import Q, Prefetch
+from django.core.paginator import Paginator
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, Prefetch
+from django.db.models.functions import Greatest
 
 from django.views.generic import View
 from django.contrib import messages
 from accounts.models import Follow
+from accounts.autocomplete import autocomplete
+from accounts.search import search_users
+from accounts.utils import with_follow_status
 from core.utils import file_validation
+from core.counters import page_comments, with_live_like_counts, with_viewer_likes
+from core.feed import feed_page, update_rank_score
+from core.threads import reply_parent, replies_page, subtree, with_thread_replies
 from story.models import *
 from core.models import *
 from core.forms import *
@@ -67,66 +80,51 @@ def profile_event(request, slug):
 @login_required
 def search(request):
     username = request.GET.get("username")
+    user_ids = []
     if username:
-        users = (
-            User.objects.filter(Q(username__icontains=username))
-            .exclude(
-                username=request.user.username,
-            )
-            .exclude(is_admin=True if request.user.is_superuser == False else None)
+        user_ids = search_users(
+            username,
+            exclude=request.user.id,
+            include_admins=request.user.is_superuser,
         )
 
-        btn = None
-        for user in users:
-            if users.exists():
-                is_following = Follow.objects.filter(
-                    follower=request.user, following=user, status=Follow.Status.ACCEPTED
-                ).exists()
-                if is_following:
-                    btn = "UnFollow"
-
-                elif Follow.objects.filter(
-                    follower=request.user, following=user, status=Follow.Status.PENDING
-                ).exists():
-                    btn = "Pending"
-
-                else:
-                    btn = "Follow"
+    page = Paginator(user_ids, settings.SEARCH_PAGE_SIZE).get_page(
+        request.GET.get("page")
+    )
+    users = with_follow_status(
+        User.objects.filter(id__in=page.object_list), request.user
+    ).in_bulk()
+    page.object_list = [
+        users[user_id] for user_id in page.object_list if user_id in users
+    ]
 
     context = {
-        "usernames": users,
+        "usernames": page,
         "name": username,
-        "btn": btn,
     }
     return render(request, "core/search.html", context)
 
 
+@login_required
+def search_autocomplete(request):
+    results = autocomplete(request.GET.get("q", "").strip(), request.user)
+    for result in results:
+        result["url"] = reverse("profile", args=[result["slug"]])
+    return JsonResponse({"results": results})
+
+
 @login_required
 def home(request):
     events = Event.objects.filter(user=request.user)
-    followers_post = Follow.objects.filter(
-        follower=request.user, status=Follow.Status.ACCEPTED
-    ).values_list("following", flat=True)
-
-    posts = (
-        Post.objects.select_related("user")
-        .prefetch_related(
-            "media",
-            Prefetch(
-                "comments",
-                queryset=Comment.objects.filter(parent=None).select_related(
-                    "user", "parent"
-                ),
-            ),
-        )
-        .filter(
-            Q(user__in=followers_post) | Q(user__verified=True) | Q(user=request.user)
-        )
-        .order_by("-like_count", "-created_at")
-    )
+    posts, next_cursor = feed_page(request.user)
+    posts = list(posts)
+    with_live_like_counts(posts + page_comments(posts))
+    with_viewer_likes(request.user, posts + page_comments(posts))
+    with_thread_replies(page_comments(posts))
 
     context = {
         "posts": posts,
+        "next_cursor": next_cursor,
         "events": events,
         "form": PostForm(),
         "commentform": CommentForm(),
@@ -134,6 +132,23 @@ def home(request):
     return render(request, "core/index.html", context)
 
 
+@login_required
+def feed(request):
+    try:
+        posts, next_cursor = feed_page(request.user, request.GET.get("cursor"))
+    except ValueError:
+        return HttpResponseBadRequest("Invalid cursor")
+    posts = list(posts)
+    with_live_like_counts(posts + page_comments(posts))
+    with_viewer_likes(request.user, posts + page_comments(posts))
+    with_thread_replies(page_comments(posts))
+
+    html = render_to_string(
+        "core/feed-posts.html", {"posts": posts}, request=request
+    )
+    return JsonResponse({"html": html, "next_cursor": next_cursor})
+
+
 @login_required
 def upload(request):
     url = request.META.get("HTTP_REFERER")
@@ -177,16 +192,36 @@ def upload(request):
         return redirect(url)
 
 
+@login_required
+def comment_replies(request, id):
+    comment = get_object_or_404(Comment, id=id)
+    try:
+        replies, next_cursor = replies_page(comment, request.GET.get("cursor"))
+    except ValueError:
+        return HttpResponseBadRequest("Invalid cursor")
+
+    html = render_to_string(
+        "core/comment-replies.html",
+        {"comment": comment, "replies": replies, "next_cursor": next_cursor},
+        request=request,
+    )
+    return JsonResponse({"html": html, "next_cursor": next_cursor})
+
+
 class PostDetailView(LoginRequiredMixin, View):
     def get(self, request, pk, *args, **kwargs):
         post = (
-            Post.objects.select_related("user").prefetch_related("comments").get(id=pk)
+            Post.objects.select_related("user").get(id=pk)
         )
         comments = (
             Comment.objects.filter(post=post, parent=None)
             .select_related("user", "parent")
             .order_by("-like_count", "-created_at")
         )
+        comments = list(comments)
+        with_live_like_counts([post] + comments)
+        with_viewer_likes(request.user, [post] + comments)
+        with_thread_replies(comments)
         form = CommentForm()
         return render(
             request,
@@ -199,7 +234,7 @@ class PostDetailView(LoginRequiredMixin, View):
 def post_update(request, pk):
     post_obj = (
         Post.objects.select_related("user")
-        .prefetch_related("media", "comments")
+        .prefetch_related("media")
         .get(pk=pk, user=request.user)
     )
     comments = (
@@ -244,6 +279,10 @@ def post_update(request, pk):
 
         return redirect("post-update", pk=pk)
 
+    comments = list(comments)
+    with_live_like_counts([post_obj] + comments)
+    with_viewer_likes(request.user, [post_obj] + comments)
+    with_thread_replies(comments)
     context = {
         "post": post_obj,
         "form": CommentForm(),
@@ -278,18 +317,26 @@ def create_comment(request):
                 messages.error(request, "Comment text is required")
                 return redirect(url)
 
-            comment = Comment.objects.create(
-                user=request.user,
-                post=Post.objects.get(id=post_id),
-                comment=comment,
+            post = Post.objects.get(id=post_id)
+            parent_comment = reply_parent(
+                Comment.objects.get(id=parent) if parent else None
             )
 
-            if parent:
-                parent_comment = Comment.objects.get(id=parent)
-                comment.parent = parent_comment
-                comment.save()
-
-                return redirect(url)
+            with transaction.atomic():
+                Comment.objects.create(
+                    user=request.user,
+                    post=post,
+                    parent=parent_comment,
+                    comment=comment,
+                )
+                Post.objects.filter(id=post.id).update(
+                    comment_count=F("comment_count") + 1
+                )
+                if parent_comment:
+                    Comment.objects.filter(id=parent_comment.id).update(
+                        reply_count=F("reply_count") + 1
+                    )
+            update_rank_score(post.id)
 
             return redirect(url)
 
@@ -323,8 +370,19 @@ def comment_update(request, id):
 def delete_comment(request, id):
     comment = get_object_or_404(Comment, id=id)
     if request.user == comment.user or request.user == comment.user:
-        comment.delete()
-        return redirect("post-detail", pk=comment.post.id)
+        with transaction.atomic():
+            removed = subtree(comment).count() + 1
+            comment.delete()
+            Post.objects.filter(id=comment.post_id).update(
+                comment_count=Greatest(F("comment_count") - removed, 0)
+            )
+            if comment.parent_id:
+                Comment.objects.filter(id=comment.parent_id).update(
+                    reply_count=Greatest(F("reply_count") - 1, 0)
+                )
+        update_rank_score(comment.post_id)
+
+        return redirect("post-detail", pk=comment.post_id)
     else:
         return redirect(request.META.get("HTTP_REFERER"))
 
@@ -1,11 +1,12 @@
 from django.contrib.contenttypes.models import ContentType
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from notifications.models import Notification
 from .utils import send_notification_to_user
 from django.dispatch import receiver
 from accounts.models import Follow
 from conversation.models import *
 from core.models import *
+from core.context_cache import bump_context
 
 
 @receiver(post_save, sender=Follow)
@@ -81,3 +82,9 @@ def create_message_notification(sender, instance, created, **kwargs):
             ntype="Message",
         )
         send_notification_to_user(notification)
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def notification_changed(sender, instance, **kwargs):
+    bump_context("alerts", instance.recipient_id)
@@ -2,6 +2,7 @@ from notifications.utils import filter_notifications_by_date_range
 from django.shortcuts import get_object_or_404, redirect, render
 from django.contrib.auth.decorators import login_required
 from notifications.models import Notification
+from core.context_cache import bump_context
 
 
 @login_required
@@ -40,6 +41,7 @@ def mark_all_as_read(request):
     Notification.objects.filter(
         id__in=notifications, recipient=request.user, read=False
     ).update(read=True)
+    bump_context("alerts", request.user.pk)
 
     return redirect(url)
 
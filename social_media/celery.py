@@ -14,5 +14,33 @@ app.conf.beat_schedule = {
     "delete-expired-stories-every-hour": {
         "task": "story.tasks.expired_story",
         "schedule": crontab(minute=0, hour="*"),
-    }
+    },
+    "refresh-post-rank-scores-every-15-minutes": {
+        "task": "core.tasks.refresh_post_rank_scores",
+        "schedule": crontab(minute="*/15"),
+    },
+    "sync-feed-pull-authors-every-minute": {
+        "task": "core.tasks.sync_feed_pull_authors",
+        "schedule": crontab(minute="*"),
+    },
+    "trim-home-timelines-every-hour": {
+        "task": "core.tasks.trim_home_timelines",
+        "schedule": crontab(minute=30, hour="*"),
+    },
+    "flush-like-counters-every-minute": {
+        "task": "core.tasks.flush_like_counters",
+        "schedule": crontab(minute="*"),
+    },
+    "collapse-like-shards-every-minute": {
+        "task": "core.tasks.collapse_like_shards",
+        "schedule": crontab(minute="*"),
+    },
+    "refresh-follow-suggestions-every-5-minutes": {
+        "task": "accounts.tasks.refresh_follow_suggestions",
+        "schedule": crontab(minute="*/5"),
+    },
+    "flush-profile-views-every-minute": {
+        "task": "accounts.tasks.flush_profile_view_buffer",
+        "schedule": crontab(minute="*"),
+    },
 }
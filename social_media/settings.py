@@ -232,8 +232,71 @@ DEFAULT_FROM_EMAIL = f'Sociala {env("EMAIL_HOST_USER", default="")}'
 ACCOUNT_EMAIL_SUBJECT_PREFIX = ""
 
 
-CELERY_BROKER_URL = env("REDIS_URL", default="")
-CELERY_RESULT_BACKEND = env("REDIS_URL", default="")
+REDIS_URL = env("REDIS_URL", default="")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+
+CONTEXT_CACHE_TIMEOUT = env.int("CONTEXT_CACHE_TIMEOUT", default=300)
+
+FEED_TIMELINE_SIZE = env.int("FEED_TIMELINE_SIZE", default=500)
+FEED_PULL_FOLLOWER_THRESHOLD = env.int("FEED_PULL_FOLLOWER_THRESHOLD", default=10000)
+FEED_PULL_AUTHORS_TIMEOUT = env.int("FEED_PULL_AUTHORS_TIMEOUT", default=600)
+FEED_RECENT_POSTS_SIZE = env.int("FEED_RECENT_POSTS_SIZE", default=50)
+FEED_PAGE_SIZE = env.int("FEED_PAGE_SIZE", default=10)
+FEED_WINDOW_TIMEOUT = env.int("FEED_WINDOW_TIMEOUT", default=600)
+FEED_RANK_DECAY = env.int("FEED_RANK_DECAY", default=45000)
+FEED_RANK_COMMENT_WEIGHT = env.float("FEED_RANK_COMMENT_WEIGHT", default=2.0)
+FEED_RANK_REFRESH_DAYS = env.int("FEED_RANK_REFRESH_DAYS", default=7)
+
+LIKE_COUNTER_BUFFERED = env.bool("LIKE_COUNTER_BUFFERED", default=False)
+LIKE_FLUSH_LOCK_TIMEOUT = env.int("LIKE_FLUSH_LOCK_TIMEOUT", default=300)
+LIKE_COUNTER_SHARDS = env.int("LIKE_COUNTER_SHARDS", default=8)
+LIKE_SHARD_THRESHOLD = env.int("LIKE_SHARD_THRESHOLD", default=60)
+
+COMMENT_REPLIES_PAGE_SIZE = env.int("COMMENT_REPLIES_PAGE_SIZE", default=5)
+COMMENT_THREAD_DEPTH = env.int("COMMENT_THREAD_DEPTH", default=8)
+
+SEARCH_PAGE_SIZE = env.int("SEARCH_PAGE_SIZE", default=20)
+SEARCH_CANDIDATES = env.int("SEARCH_CANDIDATES", default=200)
+SEARCH_FOLLOWER_WEIGHT = env.float("SEARCH_FOLLOWER_WEIGHT", default=1.0)
+AUTOCOMPLETE_LIMIT = env.int("AUTOCOMPLETE_LIMIT", default=8)
+AUTOCOMPLETE_CHANGE_TIMEOUT = env.int("AUTOCOMPLETE_CHANGE_TIMEOUT", default=3600)
+
+FOLLOW_PAGE_SIZE = env.int("FOLLOW_PAGE_SIZE", default=24)
+FOLLOW_SUGGESTIONS_SIZE = env.int("FOLLOW_SUGGESTIONS_SIZE", default=20)
+FOLLOW_SIDEBAR_SUGGESTIONS = env.int("FOLLOW_SIDEBAR_SUGGESTIONS", default=5)
+FOLLOW_SUGGESTIONS_TTL = env.int("FOLLOW_SUGGESTIONS_TTL", default=86400)
+FOLLOW_SUGGESTIONS_BATCH_SIZE = env.int("FOLLOW_SUGGESTIONS_BATCH_SIZE", default=5000)
+FOLLOW_SUGGESTIONS_PRIOR_WEIGHT = env.float(
+    "FOLLOW_SUGGESTIONS_PRIOR_WEIGHT", default=0.5
+)
+FOLLOW_GRAPH_CHUNK_SIZE = env.int("FOLLOW_GRAPH_CHUNK_SIZE", default=256)
+FOLLOW_SUGGESTIONS_ENGINE = env("FOLLOW_SUGGESTIONS_ENGINE", default="walk")
+FOLLOW_SUGGESTIONS_WORKERS = env.int("FOLLOW_SUGGESTIONS_WORKERS", default=4)
+FOLLOW_WALKS_PER_USER = env.int("FOLLOW_WALKS_PER_USER", default=200)
+FOLLOW_WALK_RESTART = env.float("FOLLOW_WALK_RESTART", default=0.15)
+FOLLOW_WALK_MAX_STEPS = env.int("FOLLOW_WALK_MAX_STEPS", default=20)
+
+PROFILE_SUMMARY_TIMEOUT = env.int("PROFILE_SUMMARY_TIMEOUT", default=3600)
+PROFILE_VIEWS_BUFFERED = env.bool("PROFILE_VIEWS_BUFFERED", default=True)
+PROFILE_VIEWS_SEEN_TIMEOUT = env.int("PROFILE_VIEWS_SEEN_TIMEOUT", default=3600)
+
+
+CELERY_BROKER_URL = REDIS_URL
+CELERY_RESULT_BACKEND = REDIS_URL
 
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
@@ -1,43 +1,67 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
 from accounts.models import Follow
+from core.context_cache import ContextSection, context_versions
 from .models import Story, StoryView
 from django.db.models import Q, Exists, OuterRef
 
 
+def story_context(user):
+    now = timezone.now()
+
+    following_ids = Follow.objects.filter(
+        follower=user, status=Follow.Status.ACCEPTED
+    ).values_list("following_id", flat=True)
+
+    stories = (
+        Story.objects.filter(Q(user__in=following_ids) | Q(user=user), expires_at__gt=now)
+        .select_related("user")
+        .order_by("user", "-created_at")
+    )
+
+    is_viewed = StoryView.objects.filter(story=OuterRef("pk"), viewer=user)
+
+    stories = stories.annotate(is_viewed=Exists(is_viewed)).order_by(
+        "is_viewed", "-created_at"
+    )
+
+    user_stories = {}
+    for story in stories:
+        if story.user not in user_stories:
+            user_stories[story.user] = []
+        user_stories[story.user].append(story)
+
+    return {"user_stories": user_stories}
+
+
+class StoryTray(ContextSection):
+    def cache_key(self):
+        key = super().cache_key()
+        following_key = f"{key}:following"
+        following = cache.get(following_key)
+        if following is None:
+            following = sorted(
+                str(user_id)
+                for user_id in Follow.objects.filter(
+                    follower=self.user, status=Follow.Status.ACCEPTED
+                ).values_list("following_id", flat=True)
+            )
+            cache.set(following_key, following, settings.CONTEXT_CACHE_TIMEOUT)
+
+        versions = context_versions("story_author", [self.user.pk, *following])
+        return f"{key}:{hashlib.md5(':'.join(versions).encode()).hexdigest()}"
+
+
 def user_stories(request):
     if "superuser" in request.path:
         return {}
     else:
         if request.user.is_authenticated:
-            now = timezone.now()
-
-            following_ids = Follow.objects.filter(
-                follower=request.user, status=Follow.Status.ACCEPTED
-            ).values_list("following_id", flat=True)
-
-            stories = (
-                Story.objects.filter(
-                    Q(user__in=following_ids) | Q(user=request.user), expires_at__gt=now
-                )
-                .select_related("user")
-                .order_by("user", "-created_at")
-            )
-
-            is_viewed = StoryView.objects.filter(
-                story=OuterRef("pk"), viewer=request.user
+            return StoryTray("stories", request.user, story_context).lazy(
+                "user_stories"
             )
 
-            stories = stories.annotate(is_viewed=Exists(is_viewed)).order_by(
-                "is_viewed", "-created_at"
-            )
-
-            user_stories = {}
-            for story in stories:
-                if story.user not in user_stories:
-                    user_stories[story.user] = []
-                user_stories[story.user].append(story)
-
-            return {"user_stories": user_stories}
-
         else:
             return {}
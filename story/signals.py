@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from core.context_cache import bump_context
+from .models import Story, StoryView
+
+
+@receiver(post_save, sender=Story)
+@receiver(post_delete, sender=Story)
+def story_changed(sender, instance, **kwargs):
+    bump_context("story_author", instance.user_id)
+
+
+@receiver(post_save, sender=StoryView)
+def story_viewed(sender, instance, created, **kwargs):
+    if created:
+        bump_context("stories", instance.viewer_id)